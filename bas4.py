@@ -1,11 +1,26 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 import os
 import re
 import random
+import time
+import hashlib
+import instructor_history
+import instructor_index
+import instructor_names
+import argparse
 import urllib3
+import catalog_db
+import change_log
+import metrics
+import output_writer
+import parser_backends
+import seat_history
+import section_index
+import term_store
+from http_client import HttpClient
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timezone
 
 
@@ -23,6 +38,28 @@ COUNTS_FILE = os.path.join(DATA_DIR, "department_counts.json")
 DEPART_FILE = "depart.txt"
 INSTRUCTORS_FILE = os.path.join(DATA_DIR, "instructors.json")
 
+# Term scraped by a plain run; --terms / --all-terms pick others
+DEFAULT_TERM = "2026FA"
+SEASON_ORDER = {"SP": 1, "SU": 2, "FA": 3}
+TERM_WORKERS = 4
+POOL_SIZE = 16
+HTTP_RETRIES = 3
+HTTP_HEDGE_AFTER = None  # seconds, "auto" (observed p95) or None
+FINGERPRINT_FILE = os.path.join(DATA_DIR, "scrape_fingerprint.json")
+
+# Cookies + token + term list from the last catalog handshake (not committed)
+SESSION_CACHE_FILE = ".scraper_session.json"
+SESSION_TTL = 30 * 60  # seconds
+
+# Sharded fetch: one GetList per department code from depart.txt.
+# DEPT_FILTER_FIELD is not confirmed against the live API, so every sharded
+# result is checked (see shard_problem) and the single request is used
+# whenever the shards do not add up.
+DEPT_FILTER_FIELD = "department"
+SHARD_PAGE_SIZE = 500
+SHARD_WORKERS = 8
+SHARD_MAX_PAGES = 20  # per department; more means paging is not honoured → single request
+
 USER_AGENTS = [
     # Windows Chrome
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.6261.129 Safari/537.36",
@@ -84,81 +121,320 @@ def load_departments():
                 departments[code.strip()] = 0
     return departments
 
+def load_latest_term_code():
+    if not os.path.exists(LATEST_TERM_FILE):
+        return None
+    with open(LATEST_TERM_FILE, "r", encoding="utf-8") as f:
+        return json.load(f).get("term_code")
+
 def save_latest_term(code, name):
-    with open(LATEST_TERM_FILE, "w", encoding="utf-8") as f:
-        json.dump({"term_code": code, "term_name": name}, f, indent=2)
+    output_writer.write_json(LATEST_TERM_FILE, {"term_code": code, "term_name": name})
 
 # ================= SESSION =================
-def create_session():
-    s = requests.Session()
-    s.headers.update(random_headers())
+class TokenRejected(RuntimeError):
+    """GetList refused the request — the (cached) token/cookies are no longer valid."""
+
+class ShardingAborted(RuntimeError):
+    """The sharded crawl stopped making sense (runaway paging) — use the single request."""
+
+def parse_catalog_page(html):
+    """Token + term selector from ONE parse of the catalog page."""
+    soup = BeautifulSoup(html, "html.parser")
+    token_input = soup.find("input", {"name": "TOKEN"}) or soup.find("input", {"name": "token"})
+    token = token_input["value"] if token_input else None
+
+    select = soup.find("select", id="empower_global_term_id")
+    terms = []
+    if select:
+        for opt in select.find_all("option"):
+            val = opt.get("value", "").strip()
+            txt = opt.get_text(strip=True)
+            if val:
+                terms.append((txt, val))
+    return token, terms
+
+def new_http_session(user_agent=None):
+    # enough keep-alive connections for the shard / term thread pools
+    s = HttpClient(pool_size=POOL_SIZE, retries=HTTP_RETRIES, hedge_after=HTTP_HEDGE_AFTER,
+                   headers=random_headers())
+    if user_agent:
+        s.headers["User-Agent"] = user_agent
+    return s
+
+def handshake():
+    """Fresh GET of CATALOG_URL → (session, token, terms)."""
+    s = new_http_session()
 
     print("→ Initializing session...")
     r = s.get(CATALOG_URL, timeout=30, verify=False)
     r.raise_for_status()
+    metrics.add(bytes_received=len(r.content))
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    token_input = soup.find("input", {"name": "TOKEN"}) or soup.find("input", {"name": "token"})
-    token = token_input["value"] if token_input else None
+    token, terms = parse_catalog_page(r.text)
 
     if token:
         print("✓ Token acquired")
     else:
         print("⚠ Token not found (using fallback)")
 
-    return s, token or "FFCCEB852C16EC9C9F4DB28054C02272DAA09A9A"
+    return s, token or "FFCCEB852C16EC9C9F4DB28054C02272DAA09A9A", terms
+
+def create_session():
+    s, token, _ = handshake()
+    return s, token
+
+# ================= SESSION CACHE =================
+def load_session_cache():
+    """(session, token, terms) from SESSION_CACHE_FILE, or None if missing/expired."""
+    if not os.path.exists(SESSION_CACHE_FILE):
+        return None
+    try:
+        with open(SESSION_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    age = time.time() - cache.get("created", 0)
+    if age > SESSION_TTL or not cache.get("token"):
+        return None
+
+    s = new_http_session(cache.get("user_agent"))
+    for c in cache.get("cookies", []):
+        s.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+
+    print(f"✓ Session cache hit ({age / 60:.0f} min old)")
+    return s, cache["token"], [tuple(t) for t in cache.get("terms", [])]
+
+def save_session_cache(session, token, terms):
+    cache = {
+        "created": time.time(),
+        "user_agent": session.headers.get("User-Agent"),
+        "token": token,
+        "terms": terms,
+        "cookies": [
+            {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+            for c in session.cookies
+        ],
+    }
+    with open(SESSION_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+
+def clear_session_cache():
+    if os.path.exists(SESSION_CACHE_FILE):
+        os.remove(SESSION_CACHE_FILE)
+
+def open_catalog_session(use_cache=True):
+    """
+    One catalog handshake per run, shared by token and term lookups.
+    With use_cache, a fresh-enough SESSION_CACHE_FILE skips the handshake
+    entirely and the caller goes straight to the GetList POST.
+    """
+    if use_cache:
+        cached = load_session_cache()
+        if cached:
+            return cached
+
+    s, token, terms = handshake()
+    save_session_cache(s, token, terms)
+    return s, token, terms
 
 # ================= TERM =================
-def fetch_latest_term():
-    print("→ Fetching latest term...")
-    r = requests.get(CATALOG_URL, headers=random_headers(), timeout=30, verify=False)
+def term_sort_key(code):
+    """2025FA < 2026SP < 2026SU < 2026FA; unknown codes sort first."""
+    m = re.match(r"^(\d{4})([A-Z]+)$", code)
+    if not m:
+        return (0, 0, code)
+    return (int(m.group(1)), SEASON_ORDER.get(m.group(2), 0), code)
+
+def fetch_terms():
+    """Every option of the empower_global_term_id selector as [(name, code)]."""
+    r = new_http_session().get(CATALOG_URL, timeout=30, verify=False)
     r.raise_for_status()
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    select = soup.find("select", id="empower_global_term_id")
-    if not select:
+    _, terms = parse_catalog_page(r.text)
+    if not terms:
         raise RuntimeError("Term selector not found")
+    return terms
+
+def fetch_latest_term(terms=None):
+    print("→ Fetching latest term...")
 
-    for opt in select.find_all("option"):
-        val = opt.get("value", "").strip()
-        txt = opt.get_text(strip=True)
-        if val == "2026FA":
+    for txt, val in terms or fetch_terms():
+        if val == DEFAULT_TERM:
             print(f"✓ Latest term: {txt} ({val})")
             return txt, val
 
     raise RuntimeError("No valid term found")
 
 # ================= FETCH COURSES =================
-def fetch_courses(session, token, term):
+def build_payload(token, term, page=1, page_size=5000, department=None):
     payload = {
         "method": "GetList",
         "fuseaction": "CourseCatalog",
         "token": token,
         "empower_global_term_id": term,
         "status": "1",
-        "page": "1",
-        "pageSize": "5000",  # Increase page size to fetch all
-        "uiGridPageSize": "5000",
-        "rows": "5000",
-        "limit": "5000",
+        "page": str(page),
+        "pageSize": str(page_size),  # Increase page size to fetch all
+        "uiGridPageSize": str(page_size),
+        "rows": str(page_size),
+        "limit": str(page_size),
     }
+    if department:
+        payload[DEPT_FILTER_FIELD] = department
+    return payload
+
+def post_getlist(session, payload):
+    headers = random_headers()
+    # keep the UA the session (and its cookies) was created with
+    headers["User-Agent"] = session.headers.get("User-Agent", headers["User-Agent"])
 
     r = session.post(
         API_URL,
         data=payload,
-        headers=random_headers(),
+        headers=headers,
         timeout=60,
         verify=False
     )
+    if r.status_code in (401, 403):
+        raise TokenRejected(f"GetList returned HTTP {r.status_code}")
     r.raise_for_status()
+    metrics.add(bytes_received=len(r.content))
+
+    try:
+        data = r.json()
+    except ValueError:
+        # an expired session gets bounced to an HTML login/error page
+        raise TokenRejected("GetList did not return JSON")
+    if not isinstance(data, dict) or "html" not in data:
+        raise TokenRejected("GetList response has no html")
+    return data.get("html", "")
 
-    data = r.json()
-    html = data.get("html", "")
+def fetch_courses(session, token, term):
+    html = post_getlist(session, build_payload(token, term))
     print(f"✓ HTML size received: {len(html):,} characters")
 
     return html
+
+# ================= SHARDED FETCH =================
+RE_GRID_ROW = re.compile(r"""class\s*=\s*["'][^"']*(?<![\w-])ui-grid-row(?![\w-])""")
+
+def grid_row_count(html):
+    """Raw div.ui-grid-row count (header and extra-meeting rows included)."""
+    return len(RE_GRID_ROW.findall(html))
+
+def fetch_shard(session, token, term, department, page):
+    html = post_getlist(session, build_payload(token, term, page, SHARD_PAGE_SIZE, department))
+    return html, grid_row_count(html)
+
+def fetch_courses_sharded(session, token, term, departments, workers=SHARD_WORKERS):
+    """
+    Fetches the catalog as one GetList request per department (depart.txt),
+    concurrently over a bounded thread pool.
+
+    - A shard whose raw grid rows fill the page is treated as truncated
+      and its next page is queued, so nothing is silently cut off. Rows are
+      counted before sections are merged, so a multi-meeting section can
+      only make this err toward one extra request.
+    - A page that was already returned (by any department, or an earlier
+      page of the same one) is never followed: the filter or the paging
+      was ignored, and shard_problem rejects the result anyway. Past
+      SHARD_MAX_PAGES for one department, ShardingAborted is raised.
+    - Nothing is parsed here: the caller fingerprints the raw pages first
+      and only parses them (parse_shards) when the catalog changed.
+    - Results come back as [(department, page, html)] sorted in
+      depart.txt order, then page order, regardless of completion order.
+    """
+    order = {dept: i for i, dept in enumerate(departments)}
+    shards = []
+    truncated = 0
+    seen_pages = set()  # hashes of every page received so far
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {
+            pool.submit(fetch_shard, session, token, term, dept, 1): (dept, 1)
+            for dept in departments
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                dept, page = pending.pop(fut)
+                html, rows = fut.result()
+                shards.append((dept, page, html))
+                # a page seen before (another department's, or this one's
+                # previous page) → filter or paging ignored: never follow it
+                page_hash = hashlib.sha256(html.encode("utf-8")).digest()
+                repeated = page_hash in seen_pages
+                seen_pages.add(page_hash)
+
+                # -------- FULL PAGE → MORE ROWS BEHIND IT --------
+                if rows >= SHARD_PAGE_SIZE and not repeated:
+                    if page >= SHARD_MAX_PAGES:
+                        for other in pending:
+                            other.cancel()
+                        raise ShardingAborted(f"shard {dept} still full after {page} pages")
+                    truncated += 1
+                    print(f"⚠ Shard {dept} page {page} is full → fetching page {page + 1}")
+                    nxt = pool.submit(fetch_shard, session, token, term, dept, page + 1)
+                    pending[nxt] = (dept, page + 1)
+
+    shards.sort(key=lambda s: (order[s[0]], s[1]))
+    total_chars = sum(len(s[2]) for s in shards)
+    print(f"✓ {len(shards)} shards received ({truncated} truncated pages followed), {total_chars:,} characters")
+
+    return shards
+
+def parse_shards(shards, backend=None):
+    """[(department, page, html)] → [(department, page, html, courses)]."""
+    return [(dept, page, html, extract_courses(html, backend)) for dept, page, html in shards]
+
+def merge_shard_courses(shards):
+    """Concatenates shard courses in shard order, first occurrence of a unique wins."""
+    courses = []
+    seen = set()
+    for _, _, _, shard_courses in shards:
+        for course in shard_courses:
+            if course["unique"] in seen:
+                continue
+            seen.add(course["unique"])
+            courses.append(course)
+    return courses
+
+def shard_problem(shards, merged, expected_departments):
+    """
+    Why the sharded result cannot be trusted, or None. Catches a filter
+    field the API ignores (every shard returns the same rows → overlap,
+    or rows from other departments) and departments that returned
+    nothing although the last scrape had sections in them.
+    """
+    rows = sum(len(shard_courses) for _, _, _, shard_courses in shards)
+    if not merged:
+        return "no rows in any shard"
+    if rows != len(merged):
+        return f"shards overlap ({rows} rows, {len(merged)} unique sections)"
+    for dept, page, _, shard_courses in shards:
+        for course in shard_courses:
+            if course["course_code"].split()[0] != dept:
+                return f"shard {dept} page {page} holds {course['course_code']}"
+    seen = {course["course_code"].split()[0] for course in merged}
+    missing = sorted(set(expected_departments) - seen)
+    if missing:
+        return f"no rows for {', '.join(missing[:5])}{' ...' if len(missing) > 5 else ''}"
+    return None
+
+def previous_departments():
+    """Department codes that had sections in the last saved department_counts.json."""
+    if not os.path.exists(COUNTS_FILE):
+        return []
+    try:
+        with open(COUNTS_FILE, "r", encoding="utf-8") as f:
+            counts = json.load(f).get("departments", {})
+    except (OSError, json.JSONDecodeError):
+        return []
+    return [dept for dept, n in counts.items() if n]
+
 # ================= build_instructor_course_data  =================
-def build_instructor_course_data():
+def build_instructor_course_data(diff=None):
     """
     Builds or updates instructor-wise course data.
 
@@ -167,6 +443,15 @@ def build_instructor_course_data():
     - Uses name|dept internally for lookup
     - Resets current_courses every run (latest term only)
     - Keeps growing all_courses (history)
+    - Spellings of one instructor share a record under the canonical
+      name and instructor_id (see instructor_names.py)
+
+    diff: optional (previous courses, change events) from this run's
+    track_course_changes → patch only the affected records
+    (see instructor_index.py); same output as the full rebuild.
+
+    Either way the latest term's entries in instructor_history.json are
+    refreshed afterwards (instructor_history.update_latest).
     """
 
     import os, json
@@ -180,15 +465,33 @@ def build_instructor_course_data():
 
     term_code = latest["term_code"]
 
-    course_file = os.path.join(DATA_DIR, f"{term_code}_courses.json")
     output_file = os.path.join(DATA_DIR, f"{term_code}_instructors.json")
 
     # ================= LOAD COURSES =================
-    with open(course_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = term_store.load_term(term_code, DATA_DIR)
 
     courses = data["courses"]
 
+    # ================= RESOLVE NAMES =================
+    names = instructor_names.load(DATA_DIR)
+    created = names.add_courses(courses)
+    if created:
+        print(f"✓ {created} new instructors registered")
+
+    # ================= INCREMENTAL (from the diff) =================
+    if diff is not None and os.path.exists(output_file):
+        old_courses, changes = diff
+        with open(output_file, "r", encoding="utf-8") as f:
+            result = instructor_index.patch(json.load(f), old_courses, courses, changes, names)
+        if result is not None:
+            instructor_list, touched = result
+            names.save(DATA_DIR)
+            output_writer.write_json(output_file, instructor_list, ensure_ascii=False)
+            print(f"✓ Instructors patched ({touched} records touched)")
+            instructor_history.update_latest(DATA_DIR, names, courses)
+            return instructor_list
+        print("⚠ Instructor file does not match the previous scrape → full rebuild")
+
     # ================= LOAD EXISTING INSTRUCTORS =================
     instructors = {}
 
@@ -197,18 +500,24 @@ def build_instructor_course_data():
             old_data = json.load(f)
 
         for inst in old_data:
-            name = inst["name"].strip()
-
             for dept in inst["departments"]:
                 dept_clean = dept.strip().upper()
+                instructor_id = names.add(inst["name"], dept_clean)
+                name = names.clusters[instructor_id]["name"]
                 key = f"{name}|{dept_clean}"
 
-                instructors[key] = {
+                # older spellings of the same instructor fold into one record
+                record = instructors.setdefault(key, {
+                    "instructor_id": instructor_id,
                     "name": name,
-                    "departments": set(inst["departments"]),  # keep FULL list
+                    "departments": set(),
                     "current_courses": [],  # RESET (important)
-                    "all_courses": set(inst["all_courses"])
-                }
+                    "all_courses": set()
+                })
+                record["departments"].update(inst["departments"])  # keep FULL list
+                record["all_courses"].update(inst["all_courses"])
+
+    names.save(DATA_DIR)
 
     # ================= PROCESS COURSES =================
     for course in courses:
@@ -219,12 +528,14 @@ def build_instructor_course_data():
 
         course_code = course["course_code"].strip()
         dept = course_code.split()[0].strip().upper()
+        instructor = names.canonical(instructor, dept)
 
         key = f"{instructor}|{dept}"
 
         # -------- CREATE IF NOT EXISTS --------
         if key not in instructors:
             instructors[key] = {
+                "instructor_id": names.resolve(instructor, dept),
                 "name": instructor,
                 "departments": set(),  # will become list later
                 "current_courses": [],
@@ -258,121 +569,79 @@ def build_instructor_course_data():
         instructor_list.append(inst)
 
     # ================= SAVE =================
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(instructor_list, f, indent=2, ensure_ascii=False)
+    output_writer.write_json(output_file, instructor_list, ensure_ascii=False)
 
     print(f"✓ Instructors updated")
+    instructor_history.update_latest(DATA_DIR, names, courses)
 
     return instructor_list
-def track_course_changes(new_courses, term_code):
- 
-    DATA_DIR = "course_data"
-    changes_file = os.path.join(DATA_DIR, "latestterm_changes.json")
-    old_file = os.path.join(DATA_DIR, f"{term_code}_courses.json")
+def load_previous_courses(term_code):
+    """Last saved scrape of term_code, or None if there is none yet."""
+    if not os.path.exists(os.path.join(DATA_DIR, f"{term_code}_courses.json")):
+        return None
+    return load_term_courses(term_code)
 
+def track_course_changes(new_courses, term_code, old_courses=None):
+    """
+    Diffs every field of every section against the previous {term}_courses.json
+    (or old_courses, if the caller already loaded it) and appends the typed
+    events to the JSONL changelog (see change_log.py); new sections and
+    instructor changes also go to the capped latestterm_changes.json.
+    """
     # ================= LOAD OLD DATA =================
+    if old_courses is None:
+        old_courses = load_previous_courses(term_code)
+
     # If previous file doesn't exist, we cannot compare
-    if not os.path.exists(old_file):
+    if old_courses is None:
         print("⚠ No previous data found → skipping change tracking")
-        return
-
-    with open(old_file, "r", encoding="utf-8") as f:
-        old_data = json.load(f)
-
-    old_courses = old_data.get("courses", [])
-
-    # ================= CREATE LOOKUP MAPS =================
-    # Use "unique" (course_code + section) as identifier
-    old_map = {c["unique"]: c for c in old_courses}
-    new_map = {c["unique"]: c for c in new_courses}
-
-    # This will store only meaningful changes
-    changes = []
-
-    # ================= COMPARE COURSES =================
-    for unique, new_course in new_map.items():
-        old_course = old_map.get(unique)
-
-        # -------- NEW SECTION ADDED --------
-        # If course doesn't exist in old data → it's new
-        if not old_course:
-            changes.append({
-                "type": "NEW_SECTION",
-                "message": f"New section added: {new_course['course_code']} ({new_course['section']}) - {new_course['instructor']}",
-                "course_code": new_course["course_code"],
-                "section": new_course["section"],
-                "instructor": new_course["instructor"],
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            })
-            continue
+        return []
 
-        # -------- INSTRUCTOR CHANGED --------
-        # Compare old vs new instructor
-        old_inst = (old_course.get("instructor") or "").strip()
-        new_inst = (new_course.get("instructor") or "").strip()
-
-        if old_inst != new_inst:
-            changes.append({
-                "type": "INSTRUCTOR_CHANGED",
-                "message": f"Instructor changed for {new_course['course_code']} ({new_course['section']}): {old_inst} → {new_inst}",
-                "course_code": new_course["course_code"],
-                "section": new_course["section"],
-                "instructor": new_inst,  # only keep latest instructor
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            })
+    # ================= COMPARE (one pass, keyed by unique) =================
+    timestamp = datetime.now(timezone.utc).isoformat()
+    changes = change_log.diff_courses(old_courses, new_courses, timestamp, term_code)
 
     # ================= NO CHANGES =================
     if not changes:
-        print("✓ No new sections/instructor changes")
-        return
-
-    # ================= LOAD EXISTING CHANGE HISTORY =================
-    # If file exists → load it, otherwise start empty
-    if os.path.exists(changes_file):
-        with open(changes_file, "r", encoding="utf-8") as f:
-            try:
-                history = json.load(f)
-            except:
-                history = []
-    else:
-        history = []
-
-    # ================= APPEND CHANGES =================
-    # This keeps full history in chronological order
-    history.extend(changes)
-
-    # ================= SAVE FILE =================
-    with open(changes_file, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
-
-    print(f"✓ {len(changes)} changes logged") 
+        print("✓ No catalog changes")
+        return []
+
+    # ================= APPEND (cost ∝ changes, not history) =================
+    change_log.migrate_legacy()
+    metrics.add(bytes_written=change_log.append_events(changes))
+    change_log.write_legacy(changes)  # bounded copy in the old format for existing readers
+    change_log.maybe_compact(term_code)
+
+    counts = defaultdict(int)
+    for c in changes:
+        counts[c["type"]] += 1
+    summary = ", ".join(f"{k} {v}" for k, v in sorted(counts.items()))
+    print(f"✓ {len(changes)} changes logged ({summary})")
+    return changes
 # ================= PARSER =================
-def parse_courses_from_html(html):
-    soup = BeautifulSoup(html, "html.parser")
-    rows = soup.select("div.ui-grid-row")
-    print(f"✓ UI-grid rows found: {len(rows)}")
+def extract_courses(html, backend=None):
+    # rows: [(has_hr, [col_strings, ...])] — see parser_backends.py
+    rows = parser_backends.get_backend(backend)(html)
 
     courses = []
-    instructors_set = set()
     re_course = re.compile(r"([A-Z]{2,}\s*\d{3,})")
 
     def safe(cols, i):
-        return cols[i].get_text(strip=True) if i < len(cols) else ""
+        return "".join(cols[i]) if i < len(cols) else ""
     a = 0
     sep = False 
-    for row in rows:
-        cols = row.find_all("div", class_=lambda x: x and "ui-grid-col-" in x)
+    for has_hr, cols in rows:
         if a < 2:
             a += 1 
             continue 
         
-        if row.find("hr"):
+        if has_hr:
             sep = True 
             continue 
         if sep:
             sep = False 
             schedule_col = cols[2] 
-            schedule_text = schedule_col.get_text("\n", strip=True)
+            schedule_text = "\n".join(schedule_col)
             schedule_parts = [p.strip() for p in schedule_text.split("\n") if p.strip()]
             days = ""
             time = ""
@@ -385,9 +654,9 @@ def parse_courses_from_html(html):
                     days = part
 
             schedule_raw = " | ".join(p for p in [days, time] if p)
-            capacity = cols[4].get_text(strip=True) if len(cols) > 4 else ""
-            available = cols[5].get_text(strip=True) if len(cols) > 5 else ""
-            classroom = cols[1].get_text(strip=True) if len(cols) > 1 else ""
+            capacity = safe(cols, 4)
+            available = safe(cols, 5)
+            classroom = safe(cols, 1)
             
             classROOMS = courses[-1]["classroom"].split(" | ")
             if classroom not in classROOMS :
@@ -400,7 +669,7 @@ def parse_courses_from_html(html):
 
         # ---- COURSE COLUMN ----
         course_col = cols[1]
-        course_text = course_col.get_text("\n", strip=True)
+        course_text = "\n".join(course_col)
         parts = [p.strip() for p in course_text.split("\n") if p.strip()]
 
         
@@ -419,7 +688,7 @@ def parse_courses_from_html(html):
 
         # ---- SCHEDULE COLUMN ----
         schedule_col = cols[4]
-        schedule_text = schedule_col.get_text("\n", strip=True)
+        schedule_text = "\n".join(schedule_col)
         schedule_parts = [p.strip() for p in schedule_text.split("\n") if p.strip()]
 
         days = ""
@@ -438,8 +707,6 @@ def parse_courses_from_html(html):
         
             
         instructor = safe(cols, 5)
-        if instructor:
-            instructors_set.add(instructor)
 
         course = {
             "course_code": course_code,
@@ -456,16 +723,57 @@ def parse_courses_from_html(html):
 
         courses.append(course)
 
+    metrics.add(rows_parsed=len(courses))
+    return courses
+
+def save_instructor_names(courses):
+    instructors_set = {c["instructor"] for c in courses if c["instructor"]}
+
     # Save instructors separately
     os.makedirs(DATA_DIR, exist_ok=True)
-    with open(INSTRUCTORS_FILE, "w", encoding="utf-8") as f:
-        json.dump(sorted(list(instructors_set)), f, indent=2, ensure_ascii=False)
+    output_writer.write_json(INSTRUCTORS_FILE, sorted(list(instructors_set)), ensure_ascii=False)
 
     print(f"✓ Instructors saved: {len(instructors_set)} unique names")
+
+def parse_courses_from_html(html, backend=None):
+    courses = extract_courses(html, backend)
     print(f"✓ Courses parsed: {len(courses)}")
 
+    save_instructor_names(courses)
     return courses
 
+def check_parser_parity(html, backend=None):
+    """
+    Parses html with the reference backend and with `backend`, and reports
+    the first differing course dict. Returns True when both agree exactly.
+    """
+    backend = backend or parser_backends.DEFAULT_BACKEND
+    ref_name = parser_backends.REFERENCE_BACKEND
+
+    t0 = time.perf_counter()
+    expected = extract_courses(html, ref_name)
+    ref_secs = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    actual = extract_courses(html, backend)
+    fast_secs = time.perf_counter() - t0
+
+    print(f"→ {ref_name}: {len(expected)} courses in {ref_secs:.3f}s | "
+          f"{backend}: {len(actual)} courses in {fast_secs:.3f}s "
+          f"({ref_secs / max(fast_secs, 1e-9):.1f}x)")
+
+    if expected == actual:
+        print("✓ Parser backends agree")
+        return True
+
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            print(f"❌ Course #{i} differs:\n   {ref_name}: {a}\n   {backend}: {b}")
+            break
+    else:
+        print(f"❌ Course counts differ: {len(expected)} vs {len(actual)}")
+    return False
+
 # ================= COUNTS =================
 def count_courses_by_department(courses, departments):
     total = len(courses)
@@ -475,42 +783,360 @@ def count_courses_by_department(courses, departments):
         departments[dept] += 1
     return total
 
+# ================= OUTPUTS =================
+def save_term_courses(term_code, term_name, courses):
+    path = os.path.join(DATA_DIR, f"{term_code}_courses.json")
+    data = {
+        "term_code": term_code,
+        "term_name": term_name,
+        "total_courses": len(courses),
+        "courses": courses
+    }
+    raw = term_store.to_json(data).encode("utf-8")
+    output_writer.write_bytes(path, raw)
+    source_sha256 = term_store.content_digest(raw)
+
+    # columnar copy for the Python readers (see term_store.py)
+    term_store.write(term_code, data, source_sha256, DATA_DIR)
+    # unique → seats lookup for the notifier (see section_index.py)
+    section_index.write_index(term_code, courses, source_sha256, DATA_DIR)
+    return source_sha256
+
+def load_term_courses(term_code):
+    return term_store.load_term(term_code, DATA_DIR).get("courses", [])
+
+def save_department_counts(courses):
+    departments = load_departments()
+    total = count_courses_by_department(courses, departments)
+
+    output_writer.write_json(COUNTS_FILE, {
+        "total_courses": total,
+        "departments": departments
+    })
+    return total
+
+# ================= FINGERPRINT CACHE =================
+def html_fingerprint(html_parts):
+    h = hashlib.sha256()
+    for part in html_parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def load_fingerprints():
+    if not os.path.exists(FINGERPRINT_FILE):
+        return {}
+    with open(FINGERPRINT_FILE, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+def cached_fingerprint(term_code):
+    """Last run's digest for term_code, or None if its outputs are missing."""
+    if not os.path.exists(os.path.join(DATA_DIR, f"{term_code}_courses.json")):
+        return None
+    return load_fingerprints().get(term_code, {}).get("html_sha256")
+
+def save_fingerprint(term_code, digest, total, courses_sha256=None):
+    """courses_sha256: hash of the {term}_courses.json written, for section_index.is_fresh."""
+    fingerprints = load_fingerprints()
+    fingerprints[term_code] = {
+        "html_sha256": digest,
+        "courses_sha256": courses_sha256,
+        "total_courses": total,
+        "updated": datetime.now(timezone.utc).isoformat(),
+    }
+    output_writer.write_json(FINGERPRINT_FILE, fingerprints)
+
 # ================= MAIN =================
-def main():
+def fetch_and_parse(session, token, term_code, sharded=False, compare=False, backend=None, known_digest=None):
+    """
+    Returns (digest, courses). courses is None when the raw GetList HTML
+    hashes to known_digest, i.e. the catalog has not changed since last run.
+    """
+    if not sharded:
+        with metrics.stage("fetch"):
+            html = fetch_courses(session, token, term_code)
+        digest = html_fingerprint([html])
+        if digest == known_digest:
+            return digest, None
+        with metrics.stage("parse"):
+            return digest, parse_courses_from_html(html, backend)
+
+    # depart.txt plus any prefix the last scrape saw (e.g. codes missing from depart.txt)
+    previous = previous_departments()
+    departments = list(dict.fromkeys([*load_departments(), *previous]))
+    print(f"→ Sharded fetch over {len(departments)} departments ({SHARD_WORKERS} workers)...")
+
+    t0 = time.perf_counter()
+    try:
+        with metrics.stage("fetch_sharded"):
+            shards = fetch_courses_sharded(session, token, term_code, departments)
+    except ShardingAborted as e:
+        print(f"⚠ Sharded fetch aborted ({e}) → single request")
+        return fetch_and_parse(session, token, term_code, False, False, backend, known_digest)
+
+    # raw pages first: an unchanged catalog is never parsed
+    # (known_digest was only saved for a result that passed shard_problem)
+    digest = html_fingerprint([html for _, _, html in shards])
+    if digest == known_digest and not compare:
+        return digest, None
+
+    with metrics.stage("parse"):
+        shards = parse_shards(shards, backend)
+        courses = merge_shard_courses(shards)
+    sharded_secs = time.perf_counter() - t0
+
+    problem = shard_problem(shards, courses, previous)
+    if problem:
+        print(f"⚠ Sharded result does not add up ({problem}) → single request")
+        return fetch_and_parse(session, token, term_code, False, False, backend, known_digest)
+    print(f"✓ Courses parsed: {len(courses)} (sharded, {sharded_secs:.2f}s)")
+
+    # -------- SPEEDUP VS SINGLE REQUEST --------
+    if compare:
+        t0 = time.perf_counter()
+        single = extract_courses(fetch_courses(session, token, term_code), backend)
+        single_secs = time.perf_counter() - t0
+        print(f"✓ Single request: {len(single)} courses in {single_secs:.2f}s")
+        print(f"✓ Speedup: {single_secs / sharded_secs:.2f}x")
+        if len(single) != len(courses):
+            print(f"⚠ Row count mismatch: single={len(single)} sharded={len(courses)}")
+
+    if digest == known_digest:
+        return digest, None
+
+    save_instructor_names(courses)
+    return digest, courses
+
+def main(sharded=False, compare=False, backend=None, force=False):
     os.makedirs(DATA_DIR, exist_ok=True)
 
-    session, token = create_session()
-    term_name, term_code = fetch_latest_term()
+    with metrics.stage("handshake"):
+        session, token, terms = open_catalog_session()
+        term_name, term_code = fetch_latest_term(terms)
+
+    known_digest = None if force else cached_fingerprint(term_code)
 
     print(f"→ Fetching courses for {term_name}...")
-    html = fetch_courses(session, token, term_code)
+    try:
+        digest, courses = fetch_and_parse(session, token, term_code, sharded, compare, backend, known_digest)
+    except TokenRejected as e:
+        print(f"⚠ Cached session rejected ({e}) → fresh handshake")
+        clear_session_cache()
+        session, token, terms = open_catalog_session(use_cache=False)
+        digest, courses = fetch_and_parse(session, token, term_code, sharded, compare, backend, known_digest)
+
+    if courses is None:
+        print(f"✓ Catalog unchanged ({digest[:12]}) — skipping parse and writes")
+        print(f"✓ HTTP: {session.stats.summary()}")
+        return
 
-    courses = parse_courses_from_html(html)
-    track_course_changes(courses, term_code)
+    save_outputs(term_code, term_name, courses, digest)
+    output_writer.report()
+    print(f"✓ HTTP: {session.stats.summary()}")
 
-    with open(os.path.join(DATA_DIR, f"{term_code}_courses.json"), "w", encoding="utf-8") as f:
-        json.dump({
-            "term_code": term_code,
-            "term_name": term_name,
-            "total_courses": len(courses),
-            "courses": courses
-        }, f, indent=2, ensure_ascii=False)
+def save_outputs(term_code, term_name, courses, digest):
+    """
+    Every output of a changed scrape (also used by seat_watch.py), then
+    the fingerprint, so the next run only skips a catalog whose outputs
+    are all written. → total course rows
+    """
+    with metrics.stage("track_changes"):
+        old_courses = load_previous_courses(term_code)
+        changes = track_course_changes(courses, term_code, old_courses)
+    with metrics.stage("write_outputs"):
+        courses_sha256 = save_term_courses(term_code, term_name, courses)
+        total = save_department_counts(courses)
+        save_latest_term(term_code, term_name)
+    with metrics.stage("seat_history"):
+        changed = seat_history.append_snapshot(term_code, courses)
+    print(f"✓ Seat history: {changed} sections changed")
+    with metrics.stage("catalog_db"):
+        catalog_db.save_term(term_code, term_name, courses)
 
-    departments = load_departments()
-    total = count_courses_by_department(courses, departments)
+    print(f"✅ DONE — {total} course rows saved")
+    
+    with metrics.stage("instructors"):
+        # previous scrape of the same term → patch instead of rebuilding
+        build_instructor_course_data((old_courses, changes) if old_courses is not None else None)
 
-    with open(COUNTS_FILE, "w", encoding="utf-8") as f:
-        json.dump({
-            "total_courses": total,
-            "departments": departments
-        }, f, indent=2)
+    # only after every write above succeeded
+    save_fingerprint(term_code, digest, len(courses), courses_sha256)
+    return total
 
-    save_latest_term(term_code, term_name)
+# ================= MULTI-TERM =================
+def scrape_term(session, token, term_name, term_code, backend=None, known_digest=None):
+    """Fetch + parse one term without touching any file. courses is None if unchanged."""
+    html = fetch_courses(session, token, term_code)
+    digest = html_fingerprint([html])
+    if digest == known_digest:
+        print(f"✓ {term_code}: unchanged ({digest[:12]})")
+        return digest, None
 
-    print(f"✅ DONE — {total} course rows saved")
-    
-    build_instructor_course_data()
+    courses = extract_courses(html, backend)
+    print(f"✓ {term_code}: {len(courses)} courses parsed")
+    return digest, courses
+
+def main_multi_term(wanted=None, backend=None, force=False):
+    """
+    Scrapes several terms concurrently over one pooled session.
+
+    wanted: list of term codes, or None for every option in the selector.
+    Each term goes to its own {term}_courses.json; the newest term that
+    returned courses becomes latest_term.json and drives the change log,
+    department counts and instructor files.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    with metrics.stage("handshake"):
+        session, token, available = open_catalog_session()
+    if not available:
+        raise RuntimeError("Term selector not found")
+    names = {code: name for name, code in available}
+
+    if wanted:
+        missing = [code for code in wanted if code not in names]
+        if missing:
+            raise RuntimeError(f"Unknown term(s): {', '.join(missing)}")
+        codes = list(dict.fromkeys(wanted))
+    else:
+        codes = list(names)
+    codes.sort(key=term_sort_key)
+    print(f"→ Scraping {len(codes)} terms ({TERM_WORKERS} workers): {', '.join(codes)}")
+
+    def scrape_all(session, token):
+        results = {}
+        with ThreadPoolExecutor(max_workers=TERM_WORKERS) as pool:
+            futures = {
+                pool.submit(
+                    scrape_term, session, token, names[code], code, backend,
+                    None if force else cached_fingerprint(code),
+                ): code
+                for code in codes
+            }
+            for fut, code in futures.items():
+                results[code] = fut.result()
+        return results
+
+    with metrics.stage("fetch_terms"):
+        try:
+            results = scrape_all(session, token)
+        except TokenRejected as e:
+            print(f"⚠ Cached session rejected ({e}) → fresh handshake")
+            clear_session_cache()
+            session, token, _ = open_catalog_session(use_cache=False)
+            results = scrape_all(session, token)
+
+    # -------- NEWEST TERM WITH DATA → LATEST --------
+    with_data = [
+        code for code in codes
+        if results[code][1] or os.path.exists(os.path.join(DATA_DIR, f"{code}_courses.json"))
+    ]
+    if not with_data:
+        print("⚠ No term returned any courses")
+        return
+    newest = max(with_data, key=term_sort_key)
+
+    diff = None
+    written = {}  # term → sha256 of the {term}_courses.json just written
+    with metrics.stage("write_terms"):
+        for code in codes:
+            digest, courses = results[code]
+            if not courses:
+                continue
+            if code == newest:
+                old_courses = load_previous_courses(code)
+                changes = track_course_changes(courses, code, old_courses)
+                if old_courses is not None:
+                    diff = (old_courses, changes)
+            written[code] = save_term_courses(code, names[code], courses)
+            seat_history.append_snapshot(code, courses)
+            catalog_db.save_term(code, names[code], courses)
+            if code != newest:
+                save_fingerprint(code, digest, len(courses), written[code])
+
+    digest, courses = results[newest]
+    older_changed = any(results[code][1] for code in codes if code != newest)
+    if courses is None:
+        if load_latest_term_code() == newest:
+            print(f"✓ Latest term {newest} unchanged — skipping latest-term outputs")
+            if older_changed:
+                # the latest term is current, but the cross-term history is not
+                with metrics.stage("instructors"):
+                    instructor_history.build(DATA_DIR)
+                output_writer.report()
+            return
+        courses = load_term_courses(newest)
+
+    with metrics.stage("write_outputs"):
+        save_instructor_names(courses)
+        total = save_department_counts(courses)
+        save_latest_term(newest, names[newest])
+    print(f"✅ DONE — latest term {names[newest]} ({newest}), {total} course rows")
+
+    with metrics.stage("instructors"):
+        if older_changed:
+            # older terms changed too → rebuild the cross-term history in one pass
+            instructor_history.build(DATA_DIR)
+        else:
+            build_instructor_course_data(diff)
+    if results[newest][1]:
+        save_fingerprint(newest, digest, len(courses), written[newest])
+    output_writer.report()
+    print(f"✓ HTTP: {session.stats.summary()}")
 
 # ================= RUN =================
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape the FCCU course catalog")
+    parser.add_argument("--sharded", action="store_true",
+                        help="fetch one GetList per department concurrently")
+    parser.add_argument("--compare", action="store_true",
+                        help="with --sharded, also time the single-request path")
+    parser.add_argument("--parser", choices=sorted(parser_backends.BACKENDS),
+                        default=parser_backends.DEFAULT_BACKEND,
+                        help="HTML parser backend for the GetList response")
+    parser.add_argument("--check-parser", metavar="HTML_FILE",
+                        help="compare --parser against the reference backend on a saved GetList HTML file and exit")
+    parser.add_argument("--terms", metavar="CODES",
+                        help="comma-separated term codes to scrape concurrently, e.g. 2026SP,2026FA")
+    parser.add_argument("--all-terms", action="store_true",
+                        help="scrape every term in the catalog's term selector")
+    parser.add_argument("--list-terms", action="store_true",
+                        help="print the catalog's term selector and exit")
+    parser.add_argument("--hedge", metavar="SECONDS",
+                        help='send a duplicate GetList if no answer after SECONDS ("auto" = observed p95)')
+    parser.add_argument("--no-session-cache", action="store_true",
+                        help="discard the cached cookies/token and do a fresh handshake")
+    parser.add_argument("--force", action="store_true",
+                        help="re-parse and rewrite outputs even if the catalog is unchanged")
+    parser.add_argument("--profile", action="store_true",
+                        help="also run cProfile + tracemalloc (→ run_profile.prof)")
+    args = parser.parse_args()
+
+    if args.check_parser:
+        with open(args.check_parser, "r", encoding="utf-8") as f:
+            ok = check_parser_parity(f.read(), args.parser)
+        raise SystemExit(0 if ok else 1)
+
+    if args.no_session_cache:
+        clear_session_cache()
+    if args.hedge:
+        HTTP_HEDGE_AFTER = args.hedge if args.hedge == "auto" else float(args.hedge)
+
+    if args.list_terms:
+        _, _, terms = open_catalog_session()
+        for name, code in sorted(terms, key=lambda t: term_sort_key(t[1])):
+            print(f"{code}  {name}")
+        raise SystemExit(0)
+
+    metrics.start_run("bas4", profile=args.profile)
+    try:
+        if args.terms or args.all_terms:
+            wanted = [t.strip() for t in args.terms.split(",") if t.strip()] if args.terms else None
+            main_multi_term(wanted, backend=args.parser, force=args.force)
+        else:
+            main(sharded=args.sharded, compare=args.compare, backend=args.parser, force=args.force)
+    finally:
+        metrics.finish_run()
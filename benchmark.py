@@ -0,0 +1,256 @@
+"""
+benchmark.py
+------------
+Offline benchmark suite for the scrape pipeline, driven by
+synthetic_catalog.py (no network, never touches the real course_data/).
+
+For every size it times:
+    parse_courses_from_html      (default parser backend)
+    track_course_changes         (against a mutated previous scrape)
+    build_instructor_course_data
+    instructor_index.patch       (same update from the diff, checked against the rebuild)
+    count_courses_by_department
+    extract_course_list.main     (three synthetic terms)
+
+and records a digest of each result. Runs are compared with
+benchmark_baseline.json: a result digest that differs, or a timing more
+than --tolerance slower than the baseline, is reported as a regression
+(exit code 1). The baseline holds one machine's timings, so it is not
+committed: save one locally before a change, then compare after it.
+
+Run from the FCCU-Advisior root:
+    python benchmark.py                       # 1k, 10k, 100k
+    python benchmark.py --sizes 1000,10000
+    python benchmark.py --save-baseline       # record this machine's numbers
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import bas4
+import change_log
+import extract_course_list
+import instructor_index
+import instructor_names
+import synthetic_catalog
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_TOLERANCE = 0.25  # 25% slower than baseline → regression
+TERM = "2026FA"
+MIN_REGRESSION_SECS = 0.02  # ignore jitter on benchmarks that take a few ms
+PARITY_MAX_SIZE = 1000  # the bs4 reference backend is slow; check parity on small sizes only
+
+
+def digest(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def timed(fn, repeat):
+    """Best wall time of `repeat` runs (stdout silenced) and the last result."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            result = fn()
+            secs = time.perf_counter() - t0
+        best = secs if best is None else min(best, secs)
+    return best, result
+
+
+def write_term(term_code, courses):
+    with contextlib.redirect_stdout(io.StringIO()):
+        bas4.save_term_courses(term_code, term_code, courses)
+
+
+def run_size(n, repeat):
+    """All benchmarks for one catalog size → {name: {"secs", "digest"}}."""
+    results = {}
+    sections = synthetic_catalog.generate_sections(n, seed=n)
+    html = synthetic_catalog.render_html(sections)
+    prev_html = synthetic_catalog.render_html(synthetic_catalog.mutate_sections(sections, seed=n + 1))
+
+    def record(name, secs, result):
+        results[name] = {"secs": round(secs, 5), "digest": digest(result)}
+        print(f"   {name:<30} {secs * 1000:>10.1f} ms")
+
+    # ---- parse ----
+    secs, courses = timed(lambda: bas4.parse_courses_from_html(html), repeat)
+    record("parse_courses_from_html", secs, courses)
+
+    if n <= PARITY_MAX_SIZE:
+        with contextlib.redirect_stdout(io.StringIO()):
+            same = bas4.check_parser_parity(html)
+        print(f"   {'parser parity vs reference':<30} {'ok' if same else 'MISMATCH':>10}")
+        if not same:
+            results["parser_parity"] = {"secs": 0, "digest": "mismatch"}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        prev_courses = bas4.extract_courses(prev_html)
+
+    # ---- diff against the previous scrape ----
+    def track():
+        write_term(TERM, prev_courses)
+        # both logs: a missing JSONL would otherwise be seeded from the legacy file
+        for path in (change_log.CHANGELOG_FILE, change_log.LEGACY_CHANGES_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        t0 = time.perf_counter()
+        bas4.track_course_changes(courses, TERM)
+        secs = time.perf_counter() - t0
+        logged = [(c["type"], c["unique"], c.get("field")) for c in change_log.read_events()]
+        return secs, logged
+
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            secs, logged = track()
+        best = secs if best is None else min(best, secs)
+    record("track_course_changes", best, logged)
+
+    # ---- instructors (fresh, no previous instructor file) ----
+    write_term(TERM, courses)
+    bas4.save_latest_term(TERM, TERM)
+
+    def instructors():
+        out = os.path.join(bas4.DATA_DIR, f"{TERM}_instructors.json")
+        if os.path.exists(out):
+            os.remove(out)
+        return bas4.build_instructor_course_data()
+    secs, inst = timed(instructors, repeat)
+    record("build_instructor_course_data", secs, inst)
+
+    # ---- instructors patched from the diff (previous scrape → current) ----
+    write_term(TERM, prev_courses)
+    with contextlib.redirect_stdout(io.StringIO()):
+        prev_inst = instructors()
+    write_term(TERM, courses)
+    changes = change_log.diff_courses(prev_courses, courses, "2026-01-01T00:00:00+00:00")
+    prev_json = json.dumps(prev_inst)
+    names = instructor_names.load(bas4.DATA_DIR)
+    names.add_courses(courses)
+
+    best = None
+    for _ in range(repeat):
+        start = json.loads(prev_json)
+        t0 = time.perf_counter()
+        result = instructor_index.patch(start, prev_courses, courses, changes, names)
+        secs = time.perf_counter() - t0
+        best = secs if best is None else min(best, secs)
+    patched = result[0] if result else None
+    record("instructor_index.patch", best, patched)
+
+    with open(os.path.join(bas4.DATA_DIR, f"{TERM}_instructors.json"), "w", encoding="utf-8") as f:
+        f.write(prev_json)
+    with contextlib.redirect_stdout(io.StringIO()):
+        rebuilt = bas4.build_instructor_course_data()
+    same = patched == rebuilt
+    print(f"   {'patch vs full rebuild':<30} {'ok' if same else 'MISMATCH':>10}")
+    if not same:
+        results["instructor_patch_parity"] = {"secs": 0, "digest": "mismatch"}
+
+    # ---- department counts ----
+    def counts():
+        departments = bas4.load_departments()
+        bas4.count_courses_by_department(courses, departments)
+        return departments
+    secs, depts = timed(counts, repeat)
+    record("count_courses_by_department", secs, depts)
+
+    # ---- course list over three terms ----
+    write_term("2025FA", prev_courses)
+    write_term("2026SP", bas4.extract_courses(synthetic_catalog.generate_html(n, seed=n + 2)))
+
+    def course_list():
+        extract_course_list.main()
+        with open(os.path.join(bas4.DATA_DIR, extract_course_list.OUT_FILENAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    secs, merged = timed(course_list, repeat)
+    record("extract_course_list.main", secs, merged)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for size, benches in results.items():
+        for name, cur in benches.items():
+            base = baseline.get(size, {}).get(name)
+            if not base:
+                continue
+            if cur["digest"] != base["digest"]:
+                regressions.append(f"{name} @ {size}: result changed ({base['digest']} → {cur['digest']})")
+            ratio = cur["secs"] / base["secs"] if base["secs"] else 1.0
+            if ratio > 1 + tolerance and cur["secs"] - base["secs"] > MIN_REGRESSION_SECS:
+                regressions.append(f"{name} @ {size}: {ratio:.2f}x slower ({base['secs']:.4f}s → {cur['secs']:.4f}s)")
+    return regressions
+
+
+def main(sizes, repeat, save_baseline, tolerance):
+    root = os.path.dirname(os.path.abspath(__file__))
+    sandbox = tempfile.mkdtemp(prefix="fccu-bench-")
+    os.makedirs(os.path.join(sandbox, bas4.DATA_DIR))
+    shutil.copy(os.path.join(root, bas4.DEPART_FILE), sandbox)
+
+    # bas4 works relative to cwd, extract_course_list relative to its own file
+    cwd = os.getcwd()
+    os.chdir(sandbox)
+    extract_course_list.COURSE_DATA_DIR = os.path.join(sandbox, bas4.DATA_DIR)
+
+    results = {}
+    try:
+        for n in sizes:
+            print(f"→ {n:,} sections")
+            results[str(n)] = run_size(n, repeat if n < 100000 else 1)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+    if save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"✓ Baseline saved → {os.path.basename(BASELINE_FILE)}")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print("⚠ No baseline yet — run with --save-baseline")
+        return 0
+
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print("❌ Regressions:")
+        for r in regressions:
+            print(f"   {r}")
+        return 1
+    print("✓ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline scrape-pipeline benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated section counts")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark (best is kept)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown vs baseline, e.g. 0.25 = 25%%")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    sys.exit(main(sizes, args.repeat, args.save_baseline, args.tolerance))
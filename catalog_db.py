@@ -0,0 +1,300 @@
+"""
+catalog_db.py
+-------------
+Local SQLite database holding every scraped term, so questions across
+terms are an indexed query instead of loading and scanning JSON files.
+
+bas4 upserts each term it scrapes into catalog.db (repo root, not
+committed). Sections that disappear from a term's scrape are deleted, so
+the table always mirrors the latest {term}_courses.json. On GitHub
+Actions the step is skipped: the runner's copy would be thrown away with
+the job. Locally, `python catalog_db.py build` loads every committed
+term file.
+
+    sections(term, unique_id, course_code, department, section,
+             course_name, credits, classroom, schedule_raw,
+             instructor, capacity, available, scraped_at)
+    terms(term, term_name, total_courses, updated_at)
+
+Query API (each takes an open connection from connect()):
+    sections_for_course(conn, "CSCS 101", term=None)
+    instructor_load(conn, "S Kamran", term=None)
+    open_seats_by_department(conn, term, department=None)
+
+Run from the FCCU-Advisior root:
+    python catalog_db.py build                       # load every *_courses.json
+    python catalog_db.py course "CSCS 101"
+    python catalog_db.py instructor "S Kamran" --term 2026FA
+    python catalog_db.py open-seats 2026FA [--department CSCS]
+    python catalog_db.py bench [--terms 8 --sections 10000]
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+
+DATA_DIR = "course_data"
+DB_FILE = "catalog.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term          TEXT PRIMARY KEY,
+    term_name     TEXT,
+    total_courses INTEGER,
+    updated_at    TEXT
+);
+CREATE TABLE IF NOT EXISTS sections (
+    term         TEXT NOT NULL,
+    unique_id    TEXT NOT NULL,
+    course_code  TEXT NOT NULL,
+    department   TEXT NOT NULL,
+    section      TEXT,
+    course_name  TEXT,
+    credits      TEXT,
+    classroom    TEXT,
+    schedule_raw TEXT,
+    instructor   TEXT,
+    capacity     INTEGER,
+    available    INTEGER,
+    scraped_at   TEXT,
+    PRIMARY KEY (term, unique_id)
+);
+CREATE INDEX IF NOT EXISTS idx_sections_course     ON sections (course_code, term);
+-- every department query also filters on term, so (term, department, ...) covers it
+DROP INDEX IF EXISTS idx_sections_department;
+CREATE INDEX IF NOT EXISTS idx_sections_term_dept  ON sections (term, department, available);
+CREATE INDEX IF NOT EXISTS idx_sections_instructor ON sections (instructor, term);
+CREATE INDEX IF NOT EXISTS idx_sections_classroom  ON sections (classroom, term);
+CREATE INDEX IF NOT EXISTS idx_sections_available  ON sections (term, available);
+"""
+
+UPSERT = """
+INSERT INTO sections (term, unique_id, course_code, department, section, course_name,
+                      credits, classroom, schedule_raw, instructor, capacity, available, scraped_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (term, unique_id) DO UPDATE SET
+    course_code = excluded.course_code, department = excluded.department,
+    section = excluded.section, course_name = excluded.course_name,
+    credits = excluded.credits, classroom = excluded.classroom,
+    schedule_raw = excluded.schedule_raw, instructor = excluded.instructor,
+    capacity = excluded.capacity, available = excluded.available,
+    scraped_at = excluded.scraped_at
+"""
+
+
+def _seats(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def connect(path=DB_FILE):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ================= UPSERT =================
+def upsert_term(conn, term_code, term_name, courses):
+    """Upserts one term's sections and drops the ones no longer listed → rows written."""
+    stamp = datetime.now(timezone.utc).isoformat()
+    rows = [
+        (
+            term_code, c["unique"], c["course_code"], c["course_code"].split()[0],
+            c.get("section"), c.get("course_name"), c.get("credits"),
+            c.get("classroom"), c.get("schedule_raw"), (c.get("instructor") or "").strip(),
+            _seats(c.get("capacity")), _seats(c.get("available")), stamp,
+        )
+        for c in courses
+    ]
+    with conn:
+        conn.executemany(UPSERT, rows)
+        conn.execute("DELETE FROM sections WHERE term = ? AND scraped_at <> ?", (term_code, stamp))
+        conn.execute(
+            "INSERT INTO terms (term, term_name, total_courses, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (term) DO UPDATE SET term_name = excluded.term_name, "
+            "total_courses = excluded.total_courses, updated_at = excluded.updated_at",
+            (term_code, term_name, len(courses), stamp),
+        )
+    return len(rows)
+
+
+def in_ci():
+    """GitHub Actions sets GITHUB_ACTIONS=true."""
+    return os.environ.get("GITHUB_ACTIONS") == "true"
+
+
+def save_term(term_code, term_name, courses, path=DB_FILE):
+    if in_ci():
+        print(f"→ {term_code}: catalog.db skipped on CI (build it locally: python catalog_db.py build)")
+        return 0
+    conn = connect(path)
+    try:
+        n = upsert_term(conn, term_code, term_name, courses)
+    finally:
+        conn.close()
+    print(f"✓ {term_code}: {n} sections upserted → {path}")
+    return n
+
+
+def build_from_json(conn, data_dir=DATA_DIR):
+    """Upserts every {term}_courses.json → list of term codes loaded."""
+    loaded = []
+    for path in sorted(glob.glob(os.path.join(data_dir, "*_courses.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # the file name is authoritative: older files carry a stale term_code inside
+        term_code = os.path.basename(path)[:-len("_courses.json")]
+        upsert_term(conn, term_code, data.get("term_name", term_code), data.get("courses", []))
+        loaded.append(term_code)
+    return loaded
+
+
+# ================= QUERIES =================
+def _term_filter(term):
+    return ("", ()) if term is None else (" AND term = ?", (term,))
+
+
+def sections_for_course(conn, course_code, term=None):
+    clause, args = _term_filter(term)
+    return conn.execute(
+        "SELECT * FROM sections WHERE course_code = ?" + clause + " ORDER BY term, section",
+        (course_code, *args),
+    ).fetchall()
+
+
+def instructor_load(conn, instructor, term=None):
+    """→ {"sections": [...], "courses": n distinct, "credits": total} per term."""
+    clause, args = _term_filter(term)
+    rows = conn.execute(
+        "SELECT term, unique_id, course_code, course_name, credits, schedule_raw, classroom "
+        "FROM sections WHERE instructor = ?" + clause + " ORDER BY term, course_code, section",
+        (instructor, *args),
+    ).fetchall()
+
+    load = {}
+    for r in rows:
+        entry = load.setdefault(r["term"], {"sections": [], "courses": set(), "credits": 0.0})
+        entry["sections"].append(dict(r))
+        entry["courses"].add(r["course_code"])
+        try:
+            entry["credits"] += float(r["credits"] or 0)
+        except ValueError:
+            pass
+    for entry in load.values():
+        entry["courses"] = len(entry["courses"])
+    return load
+
+
+def open_seats_by_department(conn, term, department=None):
+    """→ rows of (department, open_sections, open_seats), busiest first."""
+    sql = (
+        "SELECT department, COUNT(*) AS open_sections, SUM(available) AS open_seats "
+        "FROM sections WHERE term = ? AND available > 0"
+    )
+    args = [term]
+    if department:
+        sql += " AND department = ?"
+        args.append(department)
+    sql += " GROUP BY department ORDER BY open_seats DESC"
+    return conn.execute(sql, args).fetchall()
+
+
+# ================= BENCHMARK =================
+def bench(n_terms, n_sections, repeat=200):
+    import synthetic_catalog
+
+    sandbox = tempfile.mkdtemp(prefix="fccu-db-")
+    path = os.path.join(sandbox, DB_FILE)
+    conn = connect(path)
+    terms = [f"{2020 + i // 3}{('SP', 'SU', 'FA')[i % 3]}" for i in range(n_terms)]
+
+    t0 = time.perf_counter()
+    for i, term in enumerate(terms):
+        sections = synthetic_catalog.generate_sections(n_sections, seed=i)
+        courses = [{
+            "course_code": f"{s['dept']} {s['num']}",
+            "section": s["section"],
+            "unique": f"{s['dept']} {s['num']}/{s['section']}",
+            "course_name": s["title"],
+            "credits": s["credits"],
+            "classroom": s["room"],
+            "schedule_raw": s["schedule"].replace("<br/>", " | "),
+            "instructor": s["instructor"],
+            "capacity": str(s["capacity"]),
+            "available": str(s["available"]),
+        } for s in sections]
+        upsert_term(conn, term, term, courses)
+    load_secs = time.perf_counter() - t0
+    total = conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+    print(f"→ {total:,} sections over {n_terms} terms upserted in {load_secs:.2f}s")
+
+    sample = conn.execute("SELECT course_code, instructor, department FROM sections LIMIT 1").fetchone()
+    latest = terms[-1]
+    cases = [
+        ("sections_for_course (all terms)", lambda: sections_for_course(conn, sample["course_code"])),
+        ("sections_for_course (one term)", lambda: sections_for_course(conn, sample["course_code"], latest)),
+        ("instructor_load (one term)", lambda: instructor_load(conn, sample["instructor"], latest)),
+        ("open_seats_by_department (one)", lambda: open_seats_by_department(conn, latest, sample["department"])),
+        ("open_seats_by_department (all)", lambda: open_seats_by_department(conn, latest)),
+    ]
+    for label, fn in cases:
+        best = None
+        for _ in range(repeat):
+            t1 = time.perf_counter()
+            fn()
+            secs = time.perf_counter() - t1
+            best = secs if best is None else min(best, secs)
+        print(f"   {label:<34} {best * 1000:8.3f} ms")
+    conn.close()
+    shutil.rmtree(sandbox, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the local SQLite catalog")
+    parser.add_argument("--db", default=DB_FILE)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="upsert every course_data/*_courses.json")
+    p = sub.add_parser("course", help="sections for a course code")
+    p.add_argument("course_code")
+    p.add_argument("--term")
+    p = sub.add_parser("instructor", help="an instructor's load per term")
+    p.add_argument("name")
+    p.add_argument("--term")
+    p = sub.add_parser("open-seats", help="open seats by department")
+    p.add_argument("term")
+    p.add_argument("--department")
+    p = sub.add_parser("bench", help="lookup timings on a synthetic multi-term database")
+    p.add_argument("--terms", type=int, default=8)
+    p.add_argument("--sections", type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.cmd == "bench":
+        bench(args.terms, args.sections)
+    else:
+        conn = connect(args.db)
+        if args.cmd == "build":
+            terms = build_from_json(conn)
+            print(f"✓ Loaded {', '.join(terms) or 'nothing'} → {args.db}")
+        elif args.cmd == "course":
+            for r in sections_for_course(conn, args.course_code, args.term):
+                print(f"   {r['term']}  {r['unique_id']:<14} {r['instructor']:<18} {r['available']:>3}/{r['capacity']:<3} {r['schedule_raw']}")
+        elif args.cmd == "instructor":
+            for term, entry in instructor_load(conn, args.name, args.term).items():
+                print(f"→ {term}: {len(entry['sections'])} sections, {entry['courses']} courses, {entry['credits']:g} credits")
+                for s in entry["sections"]:
+                    print(f"   {s['unique_id']:<14} {s['course_name']}")
+        else:
+            for r in open_seats_by_department(conn, args.term, args.department):
+                print(f"   {r['department']:<6} {r['open_sections']:>4} sections {r['open_seats']:>5} seats")
+        conn.close()
@@ -0,0 +1,361 @@
+"""
+change_log.py
+-------------
+Field-level diff between two scrapes of a term, written to an
+append-only JSONL changelog.
+
+diff_courses() walks both catalogs once, keyed by "unique", and emits one
+typed event per changed field:
+
+    NEW_SECTION         section appears
+    SECTION_REMOVED     section disappears
+    INSTRUCTOR_CHANGED  instructor
+    SEATS_OPENED        available 0 → >0
+    SEATS_FILLED        available >0 → 0
+    CAPACITY_CHANGED    capacity
+    SCHEDULE_CHANGED    schedule_raw
+    ROOM_CHANGED        classroom
+    COURSE_RENAMED      course_name
+    CREDITS_CHANGED     credits
+
+Seat counts that move without crossing zero are not logged — during
+registration they change on every scrape and would drown the log.
+
+Events keep the fields of the old latestterm_changes.json entries
+(type, message, course_code, section, instructor, timestamp) and add
+unique / term / ts (epoch seconds, UTC) / field / old / new.
+append_events() only appends lines, so a run costs O(changes), not
+O(history).
+
+latestterm_changes.json is still written for existing readers, in its
+old shape (NEW_SECTION / INSTRUCTOR_CHANGED entries with the old keys
+only), but capped at the newest LEGACY_LIMIT entries so rewriting it
+stays cheap. The JSONL log is the complete record.
+
+ChangeIndex groups the log by (type, course_code) with timestamps already
+parsed, so "changes for X after T" is a bisect instead of a scan + date
+parse per pending notification. compact() moves other terms and events
+older than the retention window into course_data/change_archive/, which
+keeps the live log (and the notifier's load cost) bounded.
+
+Run from the FCCU-Advisior root:
+    python change_log.py stats
+    python change_log.py compact --term 2026FA [--days 30]
+"""
+
+import argparse
+import json
+import os
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import output_writer
+
+DATA_DIR = "course_data"
+CHANGELOG_FILE = os.path.join(DATA_DIR, "latestterm_changes.jsonl")
+LEGACY_CHANGES_FILE = os.path.join(DATA_DIR, "latestterm_changes.json")
+ARCHIVE_DIR = os.path.join(DATA_DIR, "change_archive")
+RETENTION_DAYS = 30
+COMPACT_THRESHOLD_BYTES = 2 * 1024 * 1024  # bas4 compacts once the live log grows past this
+LEGACY_LIMIT = 1000  # newest entries kept in latestterm_changes.json
+LEGACY_TYPES = ("NEW_SECTION", "INSTRUCTOR_CHANGED")
+LEGACY_KEYS = ("type", "message", "course_code", "section", "instructor", "timestamp")
+
+# field → event type for plain "value changed" comparisons
+FIELD_EVENTS = {
+    "course_name": "COURSE_RENAMED",
+    "credits": "CREDITS_CHANGED",
+    "classroom": "ROOM_CHANGED",
+    "schedule_raw": "SCHEDULE_CHANGED",
+    "capacity": "CAPACITY_CHANGED",
+}
+
+
+def _seats(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def to_epoch(value):
+    """ISO-8601 string (naive = UTC, as the old scraper wrote it) → epoch seconds, or None."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def event_epoch(event):
+    ts = event.get("ts")
+    return ts if ts is not None else to_epoch(event.get("timestamp"))
+
+
+def _event(kind, course, message, timestamp, field=None, old=None, new=None):
+    event = {
+        "type": kind,
+        "message": message,
+        "course_code": course["course_code"],
+        "section": course["section"],
+        "instructor": (course.get("instructor") or "").strip(),
+        "timestamp": timestamp,
+        "unique": course["unique"],
+    }
+    if field:
+        event.update({"field": field, "old": old, "new": new})
+    return event
+
+
+def diff_courses(old_courses, new_courses, timestamp, term=None):
+    """One pass over both scrapes → list of typed events, in catalog order."""
+    old_map = {c["unique"]: c for c in old_courses}
+    events = []
+
+    for new in new_courses:
+        old = old_map.pop(new["unique"], None)
+        label = f"{new['course_code']} ({new['section']})"
+
+        # -------- NEW SECTION --------
+        if old is None:
+            events.append(_event(
+                "NEW_SECTION", new,
+                f"New section added: {label} - {new['instructor']}",
+                timestamp,
+            ))
+            continue
+
+        # -------- INSTRUCTOR --------
+        old_inst = (old.get("instructor") or "").strip()
+        new_inst = (new.get("instructor") or "").strip()
+        if old_inst != new_inst:
+            events.append(_event(
+                "INSTRUCTOR_CHANGED", new,
+                f"Instructor changed for {label}: {old_inst} → {new_inst}",
+                timestamp, "instructor", old_inst, new_inst,
+            ))
+
+        # -------- SEATS --------
+        old_seats = _seats(old.get("available"))
+        new_seats = _seats(new.get("available"))
+        if old_seats <= 0 < new_seats:
+            events.append(_event(
+                "SEATS_OPENED", new,
+                f"Seats opened for {label}: {new_seats} available",
+                timestamp, "available", old.get("available"), new.get("available"),
+            ))
+        elif new_seats <= 0 < old_seats:
+            events.append(_event(
+                "SEATS_FILLED", new,
+                f"Section full: {label}",
+                timestamp, "available", old.get("available"), new.get("available"),
+            ))
+
+        # -------- PLAIN FIELDS --------
+        for field, kind in FIELD_EVENTS.items():
+            before = old.get(field, "")
+            after = new.get(field, "")
+            if before != after:
+                events.append(_event(
+                    kind, new,
+                    f"{field} changed for {label}: {before} → {after}",
+                    timestamp, field, before, after,
+                ))
+
+    # -------- REMOVED (whatever was not matched) --------
+    for old in old_map.values():
+        events.append(_event(
+            "SECTION_REMOVED", old,
+            f"Section removed: {old['course_code']} ({old['section']}) - {old['instructor']}",
+            timestamp,
+        ))
+
+    # timestamp is parsed once per run, never again by readers
+    stamp = {"term": term, "ts": to_epoch(timestamp)}
+    for event in events:
+        event.update(stamp)
+    return events
+
+
+# ================= JSONL STORE =================
+def migrate_legacy(path=CHANGELOG_FILE, legacy_path=LEGACY_CHANGES_FILE):
+    """Seeds the JSONL log from the old whole-file JSON history (once)."""
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return 0
+    with open(legacy_path, "r", encoding="utf-8") as f:
+        try:
+            history = json.load(f)
+        except json.JSONDecodeError:
+            history = []
+    append_events(history, path)
+    return len(history)
+
+
+def append_events(events, path=CHANGELOG_FILE):
+    """Appends events as JSON lines → bytes written."""
+    if not events:
+        return 0
+    lines = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+    if _ends_mid_line(path):
+        lines = "\n" + lines  # never glue onto a torn line from a crashed run
+    data = lines.encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(data)
+    return len(data)
+
+
+def write_legacy(events, legacy_path=LEGACY_CHANGES_FILE, limit=LEGACY_LIMIT):
+    """
+    Appends the events the old format knew about to latestterm_changes.json,
+    keeping only the newest `limit` entries → number of entries added.
+    """
+    added = [{k: e.get(k) for k in LEGACY_KEYS} for e in events if e.get("type") in LEGACY_TYPES]
+    if not added:
+        return 0
+    history = []
+    if os.path.exists(legacy_path):
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            try:
+                history = json.load(f)
+            except json.JSONDecodeError:
+                history = []
+    history.extend(added)
+    output_writer.write_json(legacy_path, history[-limit:], ensure_ascii=False)
+    return len(added)
+
+
+def _ends_mid_line(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def read_events(path=CHANGELOG_FILE):
+    """Every event in the log; a torn last line from a crashed run is skipped."""
+    if not os.path.exists(path):
+        return []
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+# ================= TIME INDEX =================
+class ChangeIndex:
+    """Events grouped by (type, course_code), each group sorted by epoch time."""
+
+    def __init__(self, events):
+        groups = defaultdict(list)
+        for event in events:
+            ts = event_epoch(event)
+            if ts is None:
+                continue
+            groups[(event.get("type"), event.get("course_code"))].append((ts, event))
+
+        self._times = {}
+        self._events = {}
+        for key, rows in groups.items():
+            # the log is appended in time order; only re-sort if it is not
+            if any(rows[i][0] > rows[i + 1][0] for i in range(len(rows) - 1)):
+                rows.sort(key=lambda r: r[0])
+            self._times[key] = [ts for ts, _ in rows]
+            self._events[key] = [e for _, e in rows]
+        self.size = sum(len(v) for v in self._times.values())
+
+    @classmethod
+    def load(cls, path=CHANGELOG_FILE, legacy_path=LEGACY_CHANGES_FILE):
+        if os.path.exists(path):
+            return cls(read_events(path))
+        if legacy_path and os.path.exists(legacy_path):
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                try:
+                    return cls(json.load(f))
+                except json.JSONDecodeError:
+                    pass
+        return cls([])
+
+    def since(self, kind, course_code, after):
+        """Events of `kind` for `course_code` strictly after `after` (epoch seconds)."""
+        times = self._times.get((kind, course_code))
+        if not times:
+            return []
+        return self._events[(kind, course_code)][bisect_right(times, after):]
+
+    def course_codes(self, kind):
+        return {code for k, code in self._times if k == kind}
+
+
+# ================= ROTATION / COMPACTION =================
+def compact(term, path=CHANGELOG_FILE, retention_days=RETENTION_DAYS, archive_dir=ARCHIVE_DIR, now=None):
+    """
+    Keeps `term` events from the last `retention_days` in the live log and
+    appends everything else to archive_dir/<term>.jsonl. Lines that predate
+    the ts field get it filled in on the way through.
+    → (kept, archived)
+    """
+    if not os.path.exists(path):
+        return 0, 0
+    cutoff = (now or time.time()) - retention_days * 86400
+
+    kept, archived = [], defaultdict(list)
+    for event in read_events(path):
+        ts = event_epoch(event)
+        if ts is not None:
+            event["ts"] = ts
+        event_term = event.get("term")
+        if ts is not None and ts >= cutoff and event_term in (term, None):
+            kept.append(event)
+        else:
+            archived[event_term or "legacy"].append(event)
+
+    if not archived:
+        return len(kept), 0
+
+    os.makedirs(archive_dir, exist_ok=True)
+    for name, events in archived.items():
+        append_events(events, os.path.join(archive_dir, f"{name}.jsonl"))
+
+    # rewrite atomically: a crash leaves either the old or the new log
+    output_writer.write_text(path, "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in kept))
+    return len(kept), sum(len(v) for v in archived.values())
+
+
+def maybe_compact(term, path=CHANGELOG_FILE, threshold=COMPACT_THRESHOLD_BYTES):
+    if os.path.exists(path) and os.path.getsize(path) > threshold:
+        kept, archived = compact(term, path)
+        print(f"✓ Changelog compacted: {kept} kept, {archived} archived → {ARCHIVE_DIR}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or compact the catalog changelog")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="event counts and index build time")
+    p_compact = sub.add_parser("compact", help="archive other terms and old events")
+    p_compact.add_argument("--term", required=True, help="term to keep live, e.g. 2026FA")
+    p_compact.add_argument("--days", type=int, default=RETENTION_DAYS, help="retention window")
+    args = parser.parse_args()
+
+    if args.cmd == "stats":
+        t0 = time.perf_counter()
+        index = ChangeIndex.load()
+        secs = time.perf_counter() - t0
+        size = os.path.getsize(CHANGELOG_FILE) if os.path.exists(CHANGELOG_FILE) else 0
+        print(f"✓ {index.size} events, {size:,} bytes, indexed in {secs * 1000:.1f} ms")
+    else:
+        kept, archived = compact(args.term, retention_days=args.days)
+        print(f"✓ {kept} kept, {archived} archived → {ARCHIVE_DIR}")
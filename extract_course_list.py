@@ -10,19 +10,140 @@ This file contains every unique course_code ever seen across all terms,
 with the most-recently-seen course_name and credits preserved.
 Later terms override earlier terms if the same code appears in both.
 
+Each term file's own course list is kept in a manifest
+(course_data/.course_list_manifest.json, not committed) together with
+the file's mtime and the size and SHA-256 of the bytes the list was
+parsed from (a .bin copy is only used when it was built from those same
+bytes). A run only re-reads files whose
+mtime or size moved and whose hash no longer matches; the rest come from
+the manifest. Files that do need reading are parsed in worker processes.
+When nothing changed and the output still matches its recorded hash,
+the merge and write are skipped altogether.
+
 Run from the FCCU-Advisior root:
     python extract_course_list.py
+    python extract_course_list.py --full      # ignore the manifest
 """
 
+import argparse
+import hashlib
 import json
 import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import output_writer
+import term_store
 
 COURSE_DATA_DIR = os.path.join(os.path.dirname(__file__), "course_data")
 OUT_FILENAME = "latest_course_list.json"
+MANIFEST_FILENAME = ".course_list_manifest.json"
+FIELDS = ["course_code", "course_name", "credits"]
+
+
+def _sha256(filepath):
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ================= PER-FILE =================
+def scan_file(filepath):
+    """One *_courses.json → manifest entry with that term's {code: [name, credits]}. Runs in a worker."""
+    st = os.stat(filepath)
+    basename = os.path.basename(filepath)
+    data_dir = os.path.dirname(filepath)
+
+    term = basename[: -len("_courses.json")]
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    # the manifest records the hash of exactly the bytes the courses came from
+    digest = term_store.content_digest(raw)
+    loaded = term_store.load_columns_if_built_from(term, FIELDS, digest, data_dir)
+    if loaded is not None:
+        # only the three columns we need, no JSON parse
+        meta, cols = loaded
+        rows = zip(*(cols.get(k) or [None] * len(cols[FIELDS[0]]) for k in FIELDS))
+    else:
+        meta = json.loads(raw)
+        rows = ((c.get(k) for k in FIELDS) for c in meta.get("courses", []))
+
+    courses = {}
+    for raw_code, raw_name, raw_credits in rows:
+        code = (raw_code or "").strip()
+        name = (raw_name or "").strip()
+        credits = str(raw_credits or "3.00").strip()
+
+        if not code:
+            continue
+
+        courses[code] = [name, credits]
+
+    return {
+        "mtime": st.st_mtime,
+        "size": len(raw),
+        "sha256": digest,
+        "term_code": meta.get("term_code", basename),
+        "courses": courses,
+    }
 
 
-def main():
+def scan_files(paths, workers=None):
+    """→ [manifest entry] in the order of `paths`."""
+    if workers == 1 or len(paths) <= 1:
+        return [scan_file(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(scan_file, paths))
+
+
+# ================= MANIFEST =================
+def load_manifest():
+    """→ {"fields", "files": {basename: entry}, "output": {size, sha256, total}}, or {}."""
+    path = os.path.join(COURSE_DATA_DIR, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("fields") != FIELDS:
+        return {}
+    return manifest
+
+
+def save_manifest(entries, output):
+    output_writer.write_json(
+        os.path.join(COURSE_DATA_DIR, MANIFEST_FILENAME),
+        {"fields": FIELDS, "files": entries, "output": output},
+        indent=None, ensure_ascii=False, separators=(",", ":"),
+    )
+
+
+def output_current(out_path, recorded):
+    if not recorded or not os.path.exists(out_path):
+        return False
+    return os.path.getsize(out_path) == recorded["size"] and _sha256(out_path) == recorded["sha256"]
+
+
+def cached_entry(filepath, entry):
+    """The manifest entry if `filepath` still holds what it was built from, else None."""
+    if entry is None:
+        return None
+    st = os.stat(filepath)
+    if st.st_size != entry["size"]:
+        return None
+    if st.st_mtime != entry["mtime"]:
+        # touched (e.g. a fresh checkout) → the hash decides
+        if _sha256(filepath) != entry["sha256"]:
+            return None
+        entry["mtime"] = st.st_mtime
+    return entry
+
+
+def main(full=False, workers=None):
     pattern = os.path.join(COURSE_DATA_DIR, "*_courses.json")
     # Sort so that later terms (e.g. 2026SP > 2025FA) are processed last
     # and therefore "win" when there are duplicates.
@@ -32,53 +153,71 @@ def main():
         print(f"No *_courses.json files found in {COURSE_DATA_DIR}")
         return
 
-    # Dict keyed by course_code so later terms naturally overwrite earlier ones
-    merged: dict[str, dict] = {}
-    terms_processed = []
-
+    # ---- reuse unchanged files, parse the rest in parallel ----
+    manifest = {} if full else load_manifest()
+    cached = manifest.get("files", {})
+    entries = {}
     for filepath in files:
         basename = os.path.basename(filepath)
-        print(f"  Reading: {basename}")
-
-        with open(filepath, encoding="utf-8") as f:
-            data = json.load(f)
-
-        term_code = data.get("term_code", basename)
-        terms_processed.append(term_code)
-
-        for c in data.get("courses", []):
-            code = (c.get("course_code") or "").strip()
-            name = (c.get("course_name") or "").strip()
-            credits = str(c.get("credits") or "3.00").strip()
-
-            if not code:
-                continue
-
-            merged[code] = {"code": code, "name": name, "credits": credits}
-
-    # Sort alphabetically
-    unique_courses = sorted(merged.values(), key=lambda x: x["code"])
-
-    result = {
-        "generated_from": terms_processed,
-        "total_unique_courses": len(unique_courses),
-        "courses": unique_courses,
-    }
-
+        entry = cached_entry(filepath, cached.get(basename))
+        if entry is not None:
+            print(f"  Cached : {basename}")
+            entries[basename] = entry
+
+    stale = [fp for fp in files if os.path.basename(fp) not in entries]
+    for filepath in stale:
+        print(f"  Reading: {os.path.basename(filepath)}")
+    for filepath, entry in zip(stale, scan_files(stale, workers)):
+        entries[os.path.basename(filepath)] = entry
+
+    # manifest keeps only the files that still exist
+    entries = {os.path.basename(fp): entries[os.path.basename(fp)] for fp in files}
+    terms_processed = [entry["term_code"] for entry in entries.values()]
     out_path = os.path.join(COURSE_DATA_DIR, OUT_FILENAME)
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    if not stale and entries.keys() == cached.keys() and output_current(out_path, manifest.get("output")):
+        # same inputs, output untouched since → nothing to merge or write
+        written = False
+        total_unique = manifest["output"]["total"]
+    else:
+        # Dict keyed by course_code so later terms naturally overwrite earlier ones
+        merged: dict[str, dict] = {}
+        for entry in entries.values():
+            for code, (name, credits) in entry["courses"].items():
+                merged[code] = {"code": code, "name": name, "credits": credits}
+
+        # Sort alphabetically
+        unique_courses = sorted(merged.values(), key=lambda x: x["code"])
+        total_unique = len(unique_courses)
+
+        result = {
+            "generated_from": terms_processed,
+            "total_unique_courses": total_unique,
+            "courses": unique_courses,
+        }
+
+        written = output_writer.write_json(out_path, result, ensure_ascii=False)
+
+    save_manifest(entries, {
+        "size": os.path.getsize(out_path),
+        "sha256": _sha256(out_path),
+        "total": total_unique,
+    })
 
     total_input_kb = sum(os.path.getsize(fp) for fp in files) / 1024
     out_kb = os.path.getsize(out_path) / 1024
     reduction = (1 - out_kb / total_input_kb) * 100
 
-    print(f"\n✓  Output : {OUT_FILENAME}")
-    print(f"   Terms   : {', '.join(terms_processed)}")
-    print(f"   Courses : {len(unique_courses)} unique")
+    print(f"\n✓  Output : {OUT_FILENAME}{'' if written else ' (unchanged, not rewritten)'}")
+    print(f"   Terms   : {', '.join(terms_processed)} ({len(stale)} read, {len(files) - len(stale)} cached)")
+    print(f"   Courses : {total_unique} unique")
     print(f"   Size    : {total_input_kb:.0f}KB (combined input) -> {out_kb:.0f}KB ({reduction:.0f}% smaller)")
     print(f"\nDone! Push course_data/{OUT_FILENAME} to GitHub.")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Merge every term into latest_course_list.json")
+    parser.add_argument("--full", action="store_true", help="re-read every file, ignoring the manifest")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+    main(full=args.full, workers=args.workers)
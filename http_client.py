@@ -0,0 +1,245 @@
+"""
+http_client.py
+--------------
+Shared HTTP client for every fetcher in this repo (bas4, seat_watch, ...).
+
+HttpClient wraps one requests.Session and is a drop-in for it
+(.get / .post / .request / .headers / .cookies), adding:
+
+  - a tuned keep-alive connection pool (pool_size connections per host)
+  - retries with exponential back-off + full jitter on 5xx/429,
+    timeouts and connection errors (4xx are returned immediately)
+  - optional hedging: if a request has not answered after `hedge_after`
+    seconds a duplicate is sent and whichever answers first wins
+    ("auto" hedges at the observed p95 once enough samples exist)
+  - per-request latency stats: client.stats.summary()
+
+Exercise the failure paths against a local stub server:
+    python http_client.py
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_EXCEPTIONS = (requests.Timeout, requests.ConnectionError)
+AUTO_HEDGE_MIN_SAMPLES = 20
+
+
+# ================= STATS =================
+class LatencyStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []   # seconds, one per logical request
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, latency, ok, retries, hedged, hedge_won):
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.errors += 0 if ok else 1
+            self.retries += retries
+            self.hedges += hedged
+            self.hedge_wins += hedge_won
+
+    def percentile(self, p):
+        with self._lock:
+            data = sorted(self.latencies)
+        if not data:
+            return None
+        i = min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))
+        return data[i]
+
+    def summary(self):
+        def ms(v):
+            return None if v is None else round(v * 1000, 1)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.percentile(100)),
+        }
+
+
+# ================= CLIENT =================
+class HttpClient:
+    def __init__(self, pool_size=16, retries=3, backoff=0.5, backoff_max=8.0,
+                 hedge_after=None, headers=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.stats = LatencyStats()
+        self._hedge_pool = None
+        self._hedge_lock = threading.Lock()
+
+    # -------- requests.Session look-alike --------
+    @property
+    def headers(self):
+        return self.session.headers
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        if self._hedge_pool:
+            self._hedge_pool.shutdown(wait=False)
+        self.session.close()
+
+    # -------- core --------
+    def request(self, method, url, hedge_after="default", **kwargs):
+        """
+        Like Session.request, with retry/back-off and optional hedging.
+        hedge_after: seconds, "auto", or None; defaults to the client's setting.
+        """
+        if hedge_after == "default":
+            hedge_after = self.hedge_after
+
+        start = time.perf_counter()
+        retries = hedged = hedge_won = 0
+
+        for attempt in range(self.retries + 1):
+            try:
+                resp, was_hedged, won = self._send(method, url, self._hedge_delay(hedge_after), kwargs)
+                hedged += was_hedged
+                hedge_won += won
+            except RETRY_EXCEPTIONS:
+                if attempt == self.retries:
+                    self.stats.record(time.perf_counter() - start, False, retries, hedged, hedge_won)
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    ok = resp.status_code < 500
+                    self.stats.record(time.perf_counter() - start, ok, retries, hedged, hedge_won)
+                    return resp
+
+            retries += 1
+            time.sleep(self._backoff_delay(attempt))
+
+    def _backoff_delay(self, attempt):
+        # "full jitter": uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def _hedge_delay(self, hedge_after):
+        if hedge_after != "auto":
+            return hedge_after
+        if len(self.stats.latencies) < AUTO_HEDGE_MIN_SAMPLES:
+            return None
+        return self.stats.percentile(95)
+
+    def _send(self, method, url, hedge_after, kwargs):
+        """One attempt → (response, hedged, hedge_won)."""
+        if not hedge_after:
+            return self.session.request(method, url, **kwargs), 0, 0
+
+        pool = self._pool()
+        primary = pool.submit(self.session.request, method, url, **kwargs)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result(), 0, 0
+
+        backup = pool.submit(self.session.request, method, url, **kwargs)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    return fut.result(), 1, int(fut is backup)
+                except Exception as e:  # the other copy may still succeed
+                    error = e
+        raise error
+
+    def _pool(self):
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self.pool_size)
+            return self._hedge_pool
+
+
+# ================= STUB SERVER (failure paths) =================
+def run_stub_demo():
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    hits = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                hits[self.path] = hits.get(self.path, 0) + 1
+                n = hits[self.path]
+
+            if self.path == "/flaky" and n <= 2:       # 503, 503, then 200
+                return self._reply(503, b"busy")
+            if self.path == "/slow" and n == 1:        # first copy stalls → hedge wins
+                time.sleep(1.5)
+            if self.path == "/hang" and n == 1:        # first attempt times out
+                time.sleep(2)
+            if self.path == "/down":                   # never recovers
+                return self._reply(500, b"down")
+            self._reply(200, b"ok")
+
+        def _reply(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client already timed out on this copy
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    client = HttpClient(retries=3, backoff=0.05, backoff_max=0.2)
+    cases = [
+        ("5xx then recover", "/flaky", {}),
+        ("timeout then recover", "/hang", {"timeout": 0.5}),
+        ("hedged tail latency", "/slow", {"hedge_after": 0.2}),
+        ("persistent 5xx", "/down", {}),
+    ]
+    for label, path, kwargs in cases:
+        t0 = time.perf_counter()
+        r = client.get(base + path, **kwargs)
+        print(f"→ {label:<22} {path:<7} HTTP {r.status_code} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    server.shutdown()
+    print(f"✓ Stats: {client.stats.summary()}")
+
+
+if __name__ == "__main__":
+    run_stub_demo()
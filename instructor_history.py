@@ -0,0 +1,301 @@
+"""
+instructor_history.py
+---------------------
+Cross-term instructor history, built in one pass over every
+course_data/*_courses.json.
+
+Each term file is scanned in its own worker process (name|dept → course
+codes); the main process merges the partial results and writes:
+
+    course_data/{latest}_instructors.json
+        same records as bas4.build_instructor_course_data: current_courses
+        from the latest term, all_courses = every course the instructor
+        taught in any term on disk (plus whatever the file already had).
+        Instructors who only taught in older terms get a record with
+        empty current_courses.
+
+    course_data/instructor_history.json
+        {"name|DEPT": {"instructor_id", "name", "department", "courses": {code: [terms]}}}
+
+Names are resolved through instructor_names.py first, so every spelling
+of an instructor across terms lands on the same name|DEPT.
+
+A single-term scrape only rewrites the latest instructor file, so
+bas4.build_instructor_course_data calls update_latest() afterwards: it
+rescans just the latest term and replaces that term's entries in
+instructor_history.json, keeping the committed file current without a
+full rebuild.
+
+This replaces the one-off enrich_latest_instructors_with_previous_term()
+that used to live, commented out, in test.py.
+
+Run from the FCCU-Advisior root:
+    python instructor_history.py [--workers N]
+    python instructor_history.py --bench 12     # 12 synthetic terms, 1 vs N workers
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import instructor_index
+import instructor_names
+import output_writer
+import term_store
+
+DATA_DIR = "course_data"
+HISTORY_FILE = "instructor_history.json"
+SCAN_FIELDS = ["instructor", "course_code", "schedule_raw", "classroom"]
+
+
+def _term_of(path):
+    return os.path.basename(path)[:-len("_courses.json")]
+
+
+# ================= WORKER =================
+def scan_term(path):
+    """
+    One term file → (term, {name|DEPT: sorted course codes}, {name|DEPT: meetings}).
+    Runs in a worker process.
+    """
+    term = _term_of(path)
+    data_dir = os.path.dirname(path)
+    if term_store.is_fresh(term, data_dir):
+        _, cols = term_store.load_columns(term, SCAN_FIELDS, data_dir)
+        rows = zip(*(cols[field] for field in SCAN_FIELDS))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            courses = json.load(f).get("courses", [])
+        rows = ((c.get(field) for field in SCAN_FIELDS) for c in courses)
+    taught, busy = tally(rows)
+    return term, taught, busy
+
+
+def tally(rows, with_meetings=True):
+    """(instructor, course_code, schedule_raw, classroom) rows → ({name|DEPT: sorted codes}, {name|DEPT: meetings})"""
+    taught = {}
+    busy = {}
+    for instructor, code, schedule_raw, classroom in rows:
+        instructor = (instructor or "").strip()
+        code = (code or "").strip()
+        if not instructor or not code:
+            continue
+        key = f"{instructor}|{code.split()[0].strip().upper()}"
+        taught.setdefault(key, set()).add(code)
+        if with_meetings:
+            busy.setdefault(key, set()).update(instructor_names.meetings(schedule_raw, classroom))
+    return {key: sorted(codes) for key, codes in taught.items()}, busy
+
+
+def scan_all(paths, workers=None):
+    """→ [(term, taught, meetings)] in the order of `paths`."""
+    if workers == 1 or len(paths) <= 1:
+        return [scan_term(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(scan_term, paths))
+
+
+# ================= MERGE =================
+def canonical_key(key, names):
+    if names is None:
+        return key
+    name, dept = key.rsplit("|", 1)
+    return f"{names.canonical(name, dept)}|{dept}"
+
+
+def merge(scans, names=None):
+    """[(term, taught, meetings)] → {name|DEPT: {code: [terms]}} with terms in the order scanned."""
+    history = {}
+    for term, taught, _ in scans:
+        for key, codes in taught.items():
+            courses = history.setdefault(canonical_key(key, names), {})
+            for code in codes:
+                terms = courses.setdefault(code, [])
+                if not terms or terms[-1] != term:
+                    terms.append(term)
+    return history
+
+
+def build(data_dir=DATA_DIR, workers=None):
+    """Writes the latest instructor file and instructor_history.json → instructor list."""
+    from bas4 import term_sort_key
+
+    paths = sorted(glob.glob(os.path.join(data_dir, "*_courses.json")), key=lambda p: term_sort_key(_term_of(p)))
+    if not paths:
+        print(f"⚠ No *_courses.json files in {data_dir}")
+        return []
+
+    with open(os.path.join(data_dir, "latest_term.json"), "r", encoding="utf-8") as f:
+        latest = json.load(f)["term_code"]
+
+    t0 = time.perf_counter()
+    scans = scan_all(paths, workers)
+    scan_secs = time.perf_counter() - t0
+
+    # ---- register every spelling, oldest term first ----
+    names = instructor_names.load(data_dir)
+    for term, taught, busy in scans:
+        names.register({tuple(key.rsplit("|", 1)): busy[key] for key in taught})
+    history = merge(scans, names)
+
+    # ---- existing records keep their position and history ----
+    output_file = os.path.join(data_dir, f"{latest}_instructors.json")
+    records = {}
+    if os.path.exists(output_file):
+        with open(output_file, "r", encoding="utf-8") as f:
+            for inst in json.load(f):
+                for dept in inst["departments"]:
+                    dept = dept.strip().upper()
+                    instructor_id = names.add(inst["name"], dept)
+                    name = names.clusters[instructor_id]["name"]
+                    rec = records.setdefault(f"{name}|{dept}", {
+                        "instructor_id": instructor_id,
+                        "name": name,
+                        "departments": set(),
+                        "current_courses": [],
+                        "all_courses": set(),
+                    })
+                    rec["departments"].update(inst["departments"])
+                    rec["all_courses"].update(inst["all_courses"])
+    names.save(data_dir)
+
+    def record(key):
+        if key not in records:
+            name, dept = key.rsplit("|", 1)
+            records[key] = {"instructor_id": names.resolve(name, dept), "name": name, "departments": {dept},
+                            "current_courses": [], "all_courses": set()}
+        return records[key]
+
+    # ---- current term, in catalog order (same as the full rebuild) ----
+    for course in term_store.load_term(latest, data_dir).get("courses", []):
+        key = instructor_index.course_key(course, names)
+        if key:
+            inst = record(key)
+            inst["departments"].add(key.rsplit("|", 1)[1])
+            inst["current_courses"].append(instructor_index.course_entry(course))
+            inst["all_courses"].add(course["course_code"].strip())
+
+    # ---- every other term: history only, newest first ----
+    for term, taught, _ in reversed(scans):
+        for key, codes in taught.items():
+            record(canonical_key(key, names))["all_courses"].update(codes)
+
+    instructor_list = []
+    for inst in records.values():
+        inst["departments"] = sorted(inst["departments"])
+        inst["all_courses"] = sorted(inst["all_courses"])
+        instructor_list.append(inst)
+    output_writer.write_json(output_file, instructor_list, ensure_ascii=False)
+
+    write_history(history, names, data_dir)
+
+    print(f"✓ Instructor history: {len(paths)} terms, {len(history)} instructors "
+          f"(scanned in {scan_secs:.2f}s) → {os.path.basename(output_file)}, {HISTORY_FILE}")
+    return instructor_list
+
+
+def write_history(history, names, data_dir=DATA_DIR):
+    """{name|DEPT: {code: [terms]}} → instructor_history.json"""
+    history_out = {}
+    for key in sorted(history):
+        name, dept = key.rsplit("|", 1)
+        history_out[key] = {"instructor_id": names.resolve(name, dept), "name": name, "department": dept,
+                            "courses": dict(sorted(history[key].items()))}
+    output_writer.write_json(os.path.join(data_dir, HISTORY_FILE), history_out, ensure_ascii=False)
+
+
+def update_latest(data_dir=DATA_DIR, names=None, courses=None):
+    """
+    Replaces the latest term's entries in instructor_history.json with a
+    fresh scan of that term; older terms are left as they are. courses:
+    the latest term's rows if the caller already has them, else the term
+    file is read. Without an existing history file every term is scanned.
+    → instructors in the file
+    """
+    from bas4 import term_sort_key
+
+    with open(os.path.join(data_dir, "latest_term.json"), "r", encoding="utf-8") as f:
+        latest = json.load(f)["term_code"]
+    if names is None:
+        names = instructor_names.load(data_dir)
+
+    history_path = os.path.join(data_dir, HISTORY_FILE)
+    if not os.path.exists(history_path):
+        paths = sorted(glob.glob(os.path.join(data_dir, "*_courses.json")), key=lambda p: term_sort_key(_term_of(p)))
+        history = merge(scan_all(paths), names)
+    else:
+        with open(history_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        history = {}
+        before = set()  # (name|DEPT, code) pairs the file has for the latest term
+        for key, inst in stored.items():
+            for code, terms in inst["courses"].items():
+                if latest in terms:
+                    before.add((key, code))
+                    terms = [term for term in terms if term != latest]
+                if terms:
+                    history.setdefault(key, {})[code] = terms
+
+        if courses is None:
+            _, taught, _ = scan_term(os.path.join(data_dir, f"{latest}_courses.json"))
+        else:
+            taught, _ = tally(((c.get(field) for field in SCAN_FIELDS) for c in courses), with_meetings=False)
+        after = {(canonical_key(key, names), code) for key, codes in taught.items() for code in codes}
+        if after == before:
+            print(f"✓ Instructor history: {latest} entries unchanged")
+            return len(stored)
+        for key, code in after:
+            terms = history.setdefault(key, {}).setdefault(code, [])
+            terms.append(latest)
+            terms.sort(key=term_sort_key)
+
+    write_history(history, names, data_dir)
+    print(f"✓ Instructor history: {latest} entries refreshed ({len(history)} instructors)")
+    return len(history)
+
+
+# ================= BENCHMARK =================
+def bench(n_terms, n_sections):
+    import bas4
+    import synthetic_catalog
+
+    sandbox = tempfile.mkdtemp(prefix="fccu-hist-")
+    try:
+        paths = []
+        for i in range(n_terms):
+            code = f"{2020 + i // 3}{('SP', 'SU', 'FA')[i % 3]}"
+            courses = bas4.extract_courses(synthetic_catalog.generate_html(n_sections, seed=i))
+            path = os.path.join(sandbox, f"{code}_courses.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(term_store.to_json({"term_code": code, "term_name": code,
+                                            "total_courses": len(courses), "courses": courses}))
+            paths.append(path)
+
+        cores = os.cpu_count() or 1
+        timings = {}
+        for workers in sorted({1, min(2, cores), cores}):
+            t0 = time.perf_counter()
+            merged = merge(scan_all(paths, workers))
+            timings[workers] = time.perf_counter() - t0
+            print(f"   {workers:>2} worker(s) {timings[workers]:8.2f}s  ({len(merged)} instructors)")
+        print(f"✓ {n_terms} terms × {n_sections:,} sections: {timings[1] / timings[max(timings)]:.1f}x with {max(timings)} workers")
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build cross-term instructor history")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--bench", type=int, metavar="TERMS", help="time the scan on TERMS synthetic terms and exit")
+    parser.add_argument("--sections", type=int, default=20000, help="sections per synthetic term for --bench")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench, args.sections)
+    else:
+        build(workers=args.workers)
@@ -0,0 +1,160 @@
+"""
+instructor_index.py
+-------------------
+Incremental update of {term}_instructors.json from the course diff.
+
+bas4.build_instructor_course_data rebuilds every instructor record from
+the whole term. patch() instead takes the previous instructor file, the
+previous scrape and the change events from change_log.diff_courses, and
+only touches the records of sections that were added, removed or changed
+(instructor, course name, schedule, room). The result is identical to a
+full rebuild, including record order and current_courses order.
+
+patch() returns None when it cannot guarantee that — the previous
+instructor file does not match the previous scrape, records do not follow
+the one-record-per-name|dept layout, or unchanged sections moved in the
+catalog order — and the caller falls back to the full rebuild.
+
+With a NameIndex (instructor_names.py) records are keyed by the
+instructor's canonical name, as in the full rebuild; a file written
+before names were resolved does not qualify for patching.
+"""
+
+from bisect import insort
+
+# events that change what an instructor record shows
+AFFECTING_EVENTS = {
+    "NEW_SECTION",
+    "SECTION_REMOVED",
+    "INSTRUCTOR_CHANGED",
+    "COURSE_RENAMED",
+    "SCHEDULE_CHANGED",
+    "ROOM_CHANGED",
+}
+
+
+def course_key(course, names=None):
+    """name|DEPT the full rebuild files this section under, or None if it has no instructor."""
+    instructor = (course.get("instructor") or "").strip()
+    if not instructor:
+        return None
+    dept = course["course_code"].strip().split()[0].strip().upper()
+    if names is not None:
+        instructor = names.canonical(instructor, dept)
+    return f"{instructor}|{dept}"
+
+
+def course_entry(course):
+    return {
+        "course_code": course["course_code"].strip(),
+        "section": course["section"],
+        "course_name": course["course_name"],
+        "schedule": course.get("schedule_raw", ""),
+        "classroom": course.get("classroom", ""),
+        "unique": course["unique"],
+    }
+
+
+def new_record(key, names=None):
+    name, dept = key.rsplit("|", 1)
+    inst = {"name": name, "departments": [dept], "current_courses": [], "all_courses": []}
+    if names is not None:
+        inst = {"instructor_id": names.resolve(name, dept), **inst}
+    return inst
+
+
+def _index_records(instructor_list, names=None):
+    records = {}
+    for inst in instructor_list:
+        depts = inst.get("departments") or []
+        if len(depts) != 1 or depts[0] != depts[0].strip().upper() or inst["name"] != inst["name"].strip():
+            return None
+        if names is not None:
+            instructor_id = names.resolve(inst["name"], depts[0])
+            if instructor_id is None or inst.get("instructor_id") != instructor_id \
+                    or names.clusters[instructor_id]["name"] != inst["name"]:
+                return None
+        key = f"{inst['name']}|{depts[0]}"
+        if key in records:
+            return None
+        records[key] = inst
+    return records
+
+
+def patch(instructor_list, old_courses, new_courses, changes, names=None):
+    """
+    Applies the diff to instructor_list in place.
+    names: the NameIndex the file was built with (already holding new_courses' instructors).
+    → (instructor_list, records touched), or None if a full rebuild is needed.
+    """
+    records = _index_records(instructor_list, names)
+    if records is None:
+        return None
+
+    old_by_unique = {c["unique"]: c for c in old_courses}
+    new_by_unique = {c["unique"]: c for c in new_courses}
+    if len(old_by_unique) != len(old_courses) or len(new_by_unique) != len(new_courses):
+        return None  # duplicate uniques: the diff cannot describe them
+
+    # the previous file must list exactly the previous scrape's sections
+    listed = [e["unique"] for inst in instructor_list for e in inst["current_courses"]]
+    expected = {c["unique"] for c in old_courses if (c.get("instructor") or "").strip()}
+    if len(listed) != len(expected) or set(listed) != expected:
+        return None
+
+    # current_courses follow catalog order; unchanged sections must not have moved
+    kept_old = [u for u in old_by_unique if u in new_by_unique]
+    kept_new = [u for u in new_by_unique if u in old_by_unique]
+    if kept_old != kept_new:
+        return None
+
+    affected = {e["unique"] for e in changes if e.get("type") in AFFECTING_EVENTS and e.get("unique")}
+    if not affected:
+        return instructor_list, 0
+    old_keys = {}
+    for unique in affected:
+        old = old_by_unique.get(unique)
+        key = course_key(old, names) if old is not None else None
+        if key and key not in records:
+            return None
+        old_keys[unique] = key
+
+    touched = set()
+    created = []
+
+    for unique in affected:
+        old_key = old_keys[unique]
+        if old_key:
+            inst = records[old_key]
+            inst["current_courses"] = [e for e in inst["current_courses"] if e["unique"] != unique]
+            touched.add(old_key)
+
+        new = new_by_unique.get(unique)
+        key = course_key(new, names) if new is not None else None
+        if key:
+            inst = records.get(key)
+            if inst is None:
+                inst = records[key] = new_record(key, names)
+                created.append(inst)
+            entry = course_entry(new)
+            inst["current_courses"].append(entry)
+            if entry["course_code"] not in inst["all_courses"]:
+                insort(inst["all_courses"], entry["course_code"])
+            touched.add(key)
+
+    position = {}
+    for key in touched:
+        inst = records[key]
+        if len(inst["current_courses"]) > 1:
+            if not position:
+                position = {c["unique"]: i for i, c in enumerate(new_courses)}
+            inst["current_courses"].sort(key=lambda e: position[e["unique"]])
+
+    # new name|dept records go last, in order of their first section in the catalog
+    if created:
+        if not position:
+            position = {c["unique"]: i for i, c in enumerate(new_courses)}
+        created.sort(key=lambda inst: position[inst["current_courses"][0]["unique"]])
+        instructor_list.extend(created)
+
+    return instructor_list, len(touched)
@@ -0,0 +1,388 @@
+"""
+instructor_names.py
+-------------------
+Name-resolution index for instructors.
+
+The catalog prints instructor names in a 10-character column, with
+inconsistent spacing and punctuation, so one person shows up as
+"A  Rehman" / "A Rehman", "S. Suleman" / "S Suleman", or cut off
+("ESchwaiger", "Naumaan Ch"). NameIndex clusters those spellings, across
+terms, under one stable instructor_id and one display name (the first
+spelling seen, with whitespace collapsed). IDs and display names never
+change once assigned, so files keyed by them stay valid from run to run.
+
+A name resolves, within its department, in order, by:
+    1. exact spelling (whitespace collapsed)
+    2. match key: lower-case letters and digits only, title dropped
+       ("Dr S Abbas" → "sabbas")
+    3. truncation: a name exactly TRUNCATED_AT long is a prefix of one
+       known key, or a known name of exactly that length is a prefix of it
+
+Clusters never span departments: the same spelling in CSCS and ISLM is
+two instructors. Steps 2 and 3 only join a cluster whose spellings are
+all prefixes of one another, and — when a whole term is registered with
+add_courses() — whose sections that term do not clash with the new
+spelling's (same day and time in another room). So "Dr S Abbas" (MCOM)
+stays apart from "S Abbasi" (COMP), and "Muhammad A" does not swallow
+every Muhammad A* it is a prefix of.
+A cross-department instructor can be merged by hand in instructor_ids.json
+(one cluster listing both departments); those are the entries of
+multi_dept_instructors.json.
+
+Lookups are dict hits plus a bisect over the sorted keys.
+
+    course_data/instructor_ids.json           the index (committed)
+    course_data/multi_dept_instructors.json   clusters listing 2+ departments
+
+Run from the FCCU-Advisior root:
+    python instructor_names.py build [--fresh]        # register every *_courses.json
+    python instructor_names.py resolve "A  Rehman" [--dept CSCS] ...
+    python instructor_names.py bench [--names 50000]
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import string
+import time
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+import output_writer
+
+DATA_DIR = "course_data"
+INDEX_FILE = "instructor_ids.json"
+MULTI_DEPT_FILE = "multi_dept_instructors.json"
+
+TRUNCATED_AT = 10   # width of the catalog's instructor column
+MIN_PREFIX = 6      # shorter keys never match by prefix ("A Khan" ≠ "A Khanum")
+TITLES = {"dr", "prof", "mr", "mrs", "ms"}
+PLACEHOLDERS = {"tbd", "tba", "staff"}
+TIME_RE = re.compile(r"(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})")
+
+
+def display(name):
+    return " ".join((name or "").split())
+
+
+def match_key(name):
+    words = [w for w in re.split(r"[\s.]+", (name or "").lower()) if w]
+    if len(words) > 1 and words[0] in TITLES:
+        words = words[1:]
+    return re.sub(r"[^a-z0-9]", "", "".join(words))
+
+
+@lru_cache(maxsize=4096)
+def _times(schedule_raw):
+    out = []
+    days = ""
+    for part in schedule_raw.split("|"):
+        m = TIME_RE.search(part)
+        if m is None:
+            days = part.replace(" ", "").upper()
+            continue
+        h1, m1, h2, m2 = map(int, m.groups())
+        out.extend((day, h1 * 60 + m1, h2 * 60 + m2) for day in days)
+    return tuple(out)
+
+
+def meetings(schedule_raw, classroom=""):
+    """"M W F | 10:00 - 10:50" → {(day, start, end, room)}, minutes since midnight."""
+    room = (classroom or "").strip().upper()
+    return {(day, start, end, room) for day, start, end in _times(schedule_raw or "")}
+
+
+def clash(busy, taken):
+    """True if two meetings overlap on a day in different (or unknown) rooms."""
+    for day, start, end, room in busy:
+        for day2, start2, end2, room2 in taken:
+            if day == day2 and start < end2 and start2 < end and not (room and room == room2):
+                return True
+    return False
+
+
+# ================= INDEX =================
+class NameIndex:
+    def __init__(self, instructors=(), next_id=1):
+        self.clusters = {}
+        self._by_alias = {}     # display spelling → [ids]
+        self._by_key = None     # match key → [ids]; built on the first fuzzy lookup
+        self._keys = []         # sorted match keys, for prefix lookups
+        self._truncated = {}    # match key of a cut-off alias → [ids]
+        self._by_spelling = {}  # (display spelling, DEPT) → id, None if two clusters share it
+        self.next_id = next_id
+        self.changed = False
+        for inst in instructors:
+            self.clusters[inst["instructor_id"]] = {
+                "instructor_id": inst["instructor_id"],
+                "name": inst["name"],
+                "aliases": list(inst["aliases"]),
+                "departments": list(inst["departments"]),
+            }
+            for alias in inst["aliases"]:
+                self._link(alias, inst["instructor_id"])
+            self._index_spellings(inst["instructor_id"])
+            self.next_id = max(self.next_id, inst["instructor_id"] + 1)
+
+    def __len__(self):
+        return len(self.clusters)
+
+    def _link(self, alias, instructor_id):
+        _append(self._by_alias, display(alias), instructor_id)
+        if self._by_key is not None:
+            self._link_key(alias, instructor_id)
+
+    def _link_key(self, alias, instructor_id):
+        key = match_key(alias)
+        if not key:
+            return
+        if key not in self._by_key:
+            insort(self._keys, key)
+        _append(self._by_key, key, instructor_id)
+        if len(alias) == TRUNCATED_AT and len(key) >= MIN_PREFIX:
+            _append(self._truncated, key, instructor_id)
+
+    def _index_spellings(self, instructor_id):
+        cluster = self.clusters[instructor_id]
+        for alias in cluster["aliases"]:
+            for dept in cluster["departments"]:
+                slot = (display(alias), dept)
+                self._by_spelling[slot] = instructor_id if self._by_spelling.get(slot, instructor_id) == instructor_id else None
+
+    def _levels(self, raw):
+        """Candidate ids for a spelling, best match first → [(exact, ids)]."""
+        alias = display(raw)
+        yield True, self._by_alias.get(alias, ())
+        key = match_key(alias)
+        if not key:
+            return
+        if self._by_key is None:
+            # a run that only sees known spellings never pays for this
+            self._by_key = {}
+            for instructor_id, cluster in self.clusters.items():
+                for known in cluster["aliases"]:
+                    self._link_key(known, instructor_id)
+        yield False, self._by_key.get(key, ())
+        if key in PLACEHOLDERS or len(key) < MIN_PREFIX:
+            return
+        found = []
+        if len(raw) == TRUNCATED_AT:
+            # cut-off spelling of a longer known name
+            i = bisect_left(self._keys, key)
+            while i < len(self._keys) and self._keys[i].startswith(key):
+                found.extend(self._by_key[self._keys[i]])
+                i += 1
+        for n in range(MIN_PREFIX, len(key)):
+            # longer spelling of a known cut-off name
+            found.extend(self._truncated.get(key[:n], ()))
+        yield False, found
+
+    def _compatible(self, instructor_id, key):
+        """Every spelling in the cluster is a prefix of `key` or the other way round."""
+        for alias in self.clusters[instructor_id]["aliases"]:
+            other = match_key(alias)
+            if not (other.startswith(key) or key.startswith(other)):
+                return False
+        return True
+
+    def _known(self, name, department):
+        return (display(name), department) in self._by_spelling
+
+    def resolve(self, name, department=None, busy=(), taken=None):
+        """
+        → instructor_id, or None if the name matches no cluster (or more than one).
+        department: only clusters teaching in it match.
+        busy / taken: the spelling's meetings this term and {instructor_id: meetings}
+        already placed this term; a fuzzy match whose meetings clash is refused.
+        """
+        raw = (name or "").strip()
+        if department and (display(raw), department) in self._by_spelling:
+            return self._by_spelling[(display(raw), department)]
+        key = match_key(raw)
+        for exact, ids in self._levels(raw):
+            found = set()
+            for instructor_id in ids:
+                if department and department not in self.clusters[instructor_id]["departments"]:
+                    continue
+                if not exact:
+                    if not self._compatible(instructor_id, key):
+                        continue
+                    if busy and taken and clash(busy, taken.get(instructor_id, ())):
+                        continue
+                found.add(instructor_id)
+            if found:
+                return found.pop() if len(found) == 1 else None
+        return None
+
+    def add(self, name, department=None, busy=(), taken=None):
+        """Resolves `name`, creating a cluster if needed, and records the spelling → instructor_id."""
+        raw = (name or "").strip()
+        if not raw:
+            return None
+        instructor_id = self.resolve(raw, department, busy, taken)
+        if instructor_id is None:
+            instructor_id = self.next_id
+            self.next_id += 1
+            self.clusters[instructor_id] = {
+                "instructor_id": instructor_id, "name": display(raw), "aliases": [], "departments": [],
+            }
+            self.changed = True
+        cluster = self.clusters[instructor_id]
+        # a collapsed form of a known spelling ("A Rehman" for "A  Rehman") adds nothing
+        if raw not in cluster["aliases"] and not any(display(a) == raw for a in cluster["aliases"]):
+            insort(cluster["aliases"], raw)
+            self._link(raw, instructor_id)
+            self.changed = True
+        if department and department not in cluster["departments"]:
+            insort(cluster["departments"], department)
+            self.changed = True
+        if department and (display(raw), department) not in self._by_spelling:
+            self._index_spellings(instructor_id)
+        return instructor_id
+
+    def register(self, groups):
+        """
+        groups: {(name, DEPT): meetings} for ONE term, in catalog order.
+        Spellings already in the index are placed first, so their meetings
+        are known before any fuzzy match is tried → {(name, DEPT): instructor_id}.
+        """
+        order = sorted(groups, key=lambda g: not self._known(*g))
+        taken = {}
+        ids = {}
+        for name, dept in order:
+            busy = groups[(name, dept)]
+            instructor_id = self.add(name, dept, busy, taken)
+            taken.setdefault(instructor_id, set()).update(busy)
+            ids[(name, dept)] = instructor_id
+        return ids
+
+    def add_courses(self, courses):
+        """Registers every instructor in one term's `courses` → clusters created."""
+        groups = {}
+        for c in courses:
+            instructor = (c.get("instructor") or "").strip()
+            if instructor:
+                dept = c["course_code"].strip().split()[0].upper()
+                groups.setdefault((instructor, dept), []).append(c)
+        if all(self._known(name, dept) for name, dept in groups):
+            busy = dict.fromkeys(groups, ())  # nothing new to match: schedules not needed
+        else:
+            busy = {
+                group: set().union(*(meetings(c.get("schedule_raw"), c.get("classroom")) for c in section_list))
+                for group, section_list in groups.items()
+            }
+        before = len(self.clusters)
+        self.register(busy)
+        return len(self.clusters) - before
+
+    def canonical(self, name, department=None):
+        """Display name of the cluster `name` belongs to (its own display form if none)."""
+        instructor_id = self.resolve(name, department)
+        return display(name) if instructor_id is None else self.clusters[instructor_id]["name"]
+
+    def multi_department(self):
+        return [
+            c for c in self.clusters.values()
+            if len(c["departments"]) > 1 and match_key(c["name"]) not in PLACEHOLDERS
+        ]
+
+    # ================= LOAD / SAVE =================
+    @classmethod
+    def load(cls, data_dir=DATA_DIR):
+        path = os.path.join(data_dir, INDEX_FILE)
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["instructors"], data["next_id"])
+
+    def save(self, data_dir=DATA_DIR):
+        if not self.changed and os.path.exists(os.path.join(data_dir, INDEX_FILE)):
+            return
+        instructors = [self.clusters[i] for i in sorted(self.clusters)]
+        output_writer.write_json(
+            os.path.join(data_dir, INDEX_FILE),
+            {"next_id": self.next_id, "instructors": instructors},
+            ensure_ascii=False,
+        )
+        output_writer.write_json(
+            os.path.join(data_dir, MULTI_DEPT_FILE), self.multi_department(), ensure_ascii=False,
+        )
+        self.changed = False
+
+
+def _append(index, key, instructor_id):
+    ids = index.setdefault(key, [])
+    if instructor_id not in ids:
+        ids.append(instructor_id)
+
+
+def load(data_dir=DATA_DIR):
+    return NameIndex.load(data_dir)
+
+
+def build_from_json(names=None, data_dir=DATA_DIR):
+    """Registers every {term}_courses.json, oldest term first, into `names` (not saved)."""
+    from bas4 import term_sort_key
+
+    paths = sorted(
+        glob.glob(os.path.join(data_dir, "*_courses.json")),
+        key=lambda p: term_sort_key(os.path.basename(p)[:-len("_courses.json")]),
+    )
+    names = NameIndex() if names is None else names
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            names.add_courses(json.load(f).get("courses", []))
+    return names
+
+
+# ================= BENCHMARK =================
+def bench(n_names, lookups=20000):
+    rng = random.Random(0)
+    names = NameIndex()
+    spellings = []
+    for _ in range(n_names):
+        surname = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))).title()
+        name = f"{rng.choice(string.ascii_uppercase)} {surname}"
+        names.add(name, rng.choice(["ARTS", "BIOL", "CSCS", "MATH"]))
+        spellings += [name, name.replace(" ", "  "), name[:TRUNCATED_AT], "Dr " + name]
+
+    sample = [rng.choice(spellings) for _ in range(lookups)]
+    t0 = time.perf_counter()
+    resolved = sum(names.resolve(s) is not None for s in sample)
+    secs = time.perf_counter() - t0
+    print(f"✓ {len(names):,} instructors, {lookups:,} lookups: "
+          f"{secs / lookups * 1e6:.1f} µs each, {resolved / lookups:.0%} resolved")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Instructor name-resolution index")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("build", help="register every course_data/*_courses.json")
+    p.add_argument("--fresh", action="store_true", help="start from an empty index (renumbers every id)")
+    p = sub.add_parser("resolve", help="look up names")
+    p.add_argument("names", nargs="+")
+    p.add_argument("--dept", default=None)
+    p = sub.add_parser("bench", help="lookup timings on synthetic names")
+    p.add_argument("--names", type=int, default=50000)
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        names = build_from_json(None if args.fresh else load())
+        names.save()
+        merged = sum(len(c["aliases"]) > 1 for c in names.clusters.values())
+        print(f"✓ {len(names)} instructors ({merged} with several spellings, "
+              f"{len(names.multi_department())} in several departments) → {INDEX_FILE}")
+    elif args.cmd == "resolve":
+        names = load()
+        for name in args.names:
+            t0 = time.perf_counter()
+            instructor_id = names.resolve(name, args.dept)
+            us = (time.perf_counter() - t0) * 1e6
+            cluster = names.clusters.get(instructor_id)
+            print(f"→ {name!r}: {cluster['name'] + ' #' + str(instructor_id) if cluster else 'unknown'} ({us:.0f} µs)")
+    else:
+        bench(args.names)
@@ -0,0 +1,341 @@
+"""
+mail_pool.py
+------------
+Pooled SMTP transport for the notifier.
+
+send_email used to open a new smtplib.SMTP connection per message
+(connect, EHLO, STARTTLS, EHLO, AUTH, send, QUIT). SMTPPool keeps up to
+`size` authenticated connections open for the whole run and sends over
+them from a small thread pool:
+
+    mailer = SMTPPool("smtp.gmail.com", 587, user, password)
+    fut = mailer.submit(sender, to, msg.as_string())   # → latency (s) or raises
+    mailer.close()                                     # waits, then QUITs every connection
+    mailer.stats.summary()   # 120 sent, 0 failed, 3 connections, 0 reconnects, p50 41 ms, p95 80 ms
+
+A connection the server dropped (idle timeout, 421, reset) is thrown
+away and the message retried once on a fresh one — unless DATA had
+already gone out, because the server may have queued the message and a
+resend could deliver it twice. Rejections (bad recipient, 5xx on MAIL or
+DATA) fail only that message; the session is RSET and goes back to the
+pool.
+
+LocalSMTPServer is a plain-socket stand-in (no TLS, accepts any AUTH)
+with an optional per-command delay to model network round trips, for
+load tests without touching a real mail server.
+
+Run from the FCCU-Advisior root:
+    python mail_pool.py bench [--messages 300 --latency 0.02 --size 4]
+"""
+
+import argparse
+import queue
+import smtplib
+import socket
+import socketserver
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+POOL_SIZE = 4
+TIMEOUT_SECS = 30
+
+# the connection is gone: throw it away and retry on a fresh one
+# (SMTPException is an OSError, so OSError itself must not be listed here)
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+class MailStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+        self.connections = 0
+        self.reconnects = 0
+        self.latencies = []
+
+    def record(self, latency=None, ok=True):
+        with self._lock:
+            if ok:
+                self.sent += 1
+                self.latencies.append(latency)
+            else:
+                self.failed += 1
+
+    def bump(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        return (
+            f"{self.sent} sent, {self.failed} failed, {self.connections} connections, "
+            f"{self.reconnects} reconnects, p50 {self.percentile(50) * 1000:.0f} ms, "
+            f"p95 {self.percentile(95) * 1000:.0f} ms"
+        )
+
+
+# ================= POOL =================
+class SMTPPool:
+    def __init__(self, host, port=587, user=None, password=None, size=POOL_SIZE, starttls=True, timeout=TIMEOUT_SECS):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = size
+        self.starttls = starttls
+        self.timeout = timeout
+        self.stats = MailStats()
+        self._idle = queue.LifoQueue()  # most recently used first: least likely to have timed out
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self._futures = []
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.ehlo()
+            if self.starttls:
+                conn.starttls(context=ssl.create_default_context())
+                conn.ehlo()
+            if self.user:
+                conn.login(self.user, self.password)
+        except Exception:
+            self._discard(conn)
+            raise
+        self.stats.bump("connections")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _transaction(conn, sender, to, message, phase):
+        """sendmail() step by step, so a failure is known to be before or after DATA."""
+        recipients = [to] if isinstance(to, str) else list(to)
+        code, resp = conn.mail(sender)
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, resp, sender)
+        refused = {}
+        for rcpt in recipients:
+            code, resp = conn.rcpt(rcpt)
+            if code not in (250, 251):
+                refused[rcpt] = (code, resp)
+        if len(refused) == len(recipients):
+            raise smtplib.SMTPRecipientsRefused(refused)
+        phase["data"] = True
+        # raises SMTPDataError itself when DATA is not answered with 354
+        code, resp = conn.data(message)
+        if code != 250:
+            raise smtplib.SMTPDataError(code, resp)
+        return refused
+
+    def _release(self, conn):
+        """After a rejection: RSET the open transaction, then back to the pool (or closed if RSET fails)."""
+        try:
+            conn.rset()
+        except Exception:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    def send(self, sender, to, message):
+        """Sends one message on a pooled connection → latency in seconds. Raises on failure."""
+        t0 = time.perf_counter()
+        for attempt in range(2):
+            conn = None
+            phase = {"data": False}
+            try:
+                conn = self._acquire()
+                self._transaction(conn, sender, to, message, phase)
+            except smtplib.SMTPRecipientsRefused:
+                # bad recipient: the session itself is still good
+                self._release(conn)
+                self.stats.record(ok=False)
+                raise
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code == 421:
+                    # service closing the channel; a 4xx reply means nothing was accepted
+                    if conn is not None:
+                        self._discard(conn)
+                    if not attempt:
+                        self.stats.bump("reconnects")
+                        continue
+                elif conn is not None:
+                    self._release(conn)  # 5xx on MAIL / DATA
+                self.stats.record(ok=False)
+                raise
+            except RECONNECT_ERRORS:
+                if conn is not None:
+                    self._discard(conn)
+                if attempt or phase["data"]:
+                    # after DATA the server may have the message: do not risk sending it twice
+                    self.stats.record(ok=False)
+                    raise
+                self.stats.bump("reconnects")
+                continue
+            except Exception:
+                # TLS errors, auth failures, anything unexpected: the session state is unknown
+                if conn is not None:
+                    self._discard(conn)
+                self.stats.record(ok=False)
+                raise
+            self._idle.put(conn)
+            latency = time.perf_counter() - t0
+            self.stats.record(latency)
+            return latency
+
+    def submit(self, sender, to, message):
+        """Queues send() on the pool → Future resolving to the latency."""
+        fut = self._executor.submit(self.send, sender, to, message)
+        self._futures.append(fut)
+        return fut
+
+    def wait(self):
+        for fut in self._futures:
+            fut.exception()  # block; errors are reported through the future
+        self._futures = []
+
+    def close(self):
+        self.wait()
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.quit()
+            except Exception:
+                self._discard(conn)
+
+
+# ================= LOCAL STAND-IN =================
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.count("connections")
+        self.reply("220 localhost stand-in ready")
+        sent_here = 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.decode("ascii", "replace").strip().split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n")
+                self.reply("250 OK")
+            elif verb == "AUTH":
+                self.reply("235 Authentication successful")
+            elif verb in ("MAIL", "RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                if b"reject" in line:
+                    self.reply("550 No such user")
+                else:
+                    self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                server.count("messages")
+                sent_here += 1
+                self.reply("250 OK queued")
+                if server.drop_after and sent_here >= server.drop_after:
+                    return  # hang up without a word, like an idle timeout
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """SMTP stand-in on 127.0.0.1. latency: delay per reply; drop_after: hang up after n messages."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latency=0.0, drop_after=0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.latency = latency
+        self.drop_after = drop_after
+        self.counts = {"connections": 0, "messages": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, field):
+        with self._lock:
+            self.counts[field] += 1
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+# ================= BENCHMARK =================
+def bench(messages, latency, size):
+    message = "Subject: Seat Available\r\n\r\nGood news!\r\n"
+    recipients = [f"{25100000 + i}@formanite.fccollege.edu.pk" for i in range(messages)]
+
+    with LocalSMTPServer(latency=latency) as server:
+        # one connection per message, as send_email used to
+        t0 = time.perf_counter()
+        for to in recipients:
+            conn = smtplib.SMTP("127.0.0.1", server.port, timeout=TIMEOUT_SECS)
+            conn.ehlo()
+            conn.login("notifier", "secret")
+            conn.sendmail("notifier@localhost", to, message)
+            conn.quit()
+        serial = time.perf_counter() - t0
+        print(f"   per-message connections   {serial:7.2f}s  ({messages / serial:6.1f} msg/s)")
+
+        before = dict(server.counts)
+        mailer = SMTPPool("127.0.0.1", server.port, "notifier", "secret", size=size, starttls=False)
+        t0 = time.perf_counter()
+        for to in recipients:
+            mailer.submit("notifier@localhost", to, message)
+        mailer.close()
+        pooled = time.perf_counter() - t0
+        print(f"   pool of {size:<2}                {pooled:7.2f}s  ({messages / pooled:6.1f} msg/s)")
+        print(f"   {mailer.stats.summary()}, server saw "
+              f"{server.counts['connections'] - before['connections']} connections")
+    print(f"✓ {messages} messages at {latency * 1000:.0f} ms per reply: {serial / pooled:.1f}x faster pooled")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pooled SMTP transport")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("bench", help="per-message vs pooled sends against the local stand-in")
+    p.add_argument("--messages", type=int, default=300)
+    p.add_argument("--latency", type=float, default=0.02, help="seconds per server reply")
+    p.add_argument("--size", type=int, default=POOL_SIZE)
+    args = parser.parse_args()
+    bench(args.messages, args.latency, args.size)
@@ -0,0 +1,160 @@
+"""
+metrics.py
+----------
+Lightweight per-stage instrumentation for the scrape pipeline.
+
+    metrics.start_run("bas4")
+    with metrics.stage("parse"):
+        courses = parse_courses_from_html(html)
+        metrics.add(rows_parsed=len(courses))
+    metrics.finish_run()                # → run_metrics.json
+
+Each stage records wall time, CPU time, peak RSS and the counters
+bytes_received / rows_parsed / bytes_written / bytes_skipped (outputs
+left alone because they were unchanged, see output_writer.py). Counters added from worker
+threads land in the innermost stage that is open at the time.
+
+bytes_written / bytes_skipped come from output_writer for every file it
+writes; the append-only logs (change_log, seat_history) add their own.
+
+start_run(..., profile=True) also runs cProfile over the whole run
+(→ run_profile.prof + top functions printed) and tracemalloc, which adds
+each stage's peak Python allocation.
+
+When no run is active every helper is a no-op, so instrumented code can
+be imported and called from other scripts unchanged.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_FILE = "run_metrics.json"
+PROFILE_FILE = "run_profile.prof"
+COUNTERS = ("bytes_received", "rows_parsed", "bytes_written", "bytes_skipped")
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+
+class RunMetrics:
+    def __init__(self, name, profile=False):
+        self.name = name
+        self.profile = profile
+        self.started = datetime.now(timezone.utc).isoformat()
+        self.stages = []
+        self._open = []
+        self._lock = threading.Lock()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._profiler = None
+
+        if profile:
+            tracemalloc.start()
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @contextmanager
+    def stage(self, name):
+        record = {"name": name, **{c: 0 for c in COUNTERS}}
+        with self._lock:
+            self._open.append(record)
+        if self.profile:
+            tracemalloc.reset_peak()
+
+        wall0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_s"] = round(time.perf_counter() - wall0, 4)
+            record["cpu_s"] = round(time.process_time() - cpu0, 4)
+            record["peak_rss_mb"] = peak_rss_mb()
+            if self.profile:
+                record["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+            with self._lock:
+                self._open.remove(record)
+                self.stages.append(record)
+
+    def add(self, **counters):
+        with self._lock:
+            if not self._open:
+                return
+            target = self._open[-1]
+            for key, value in counters.items():
+                target[key] = target.get(key, 0) + value
+
+    def finish(self, path=METRICS_FILE):
+        report = {
+            "run": self.name,
+            "started": self.started,
+            "total": {
+                "wall_s": round(time.perf_counter() - self._wall0, 4),
+                "cpu_s": round(time.process_time() - self._cpu0, 4),
+                "peak_rss_mb": peak_rss_mb(),
+                **{c: sum(s.get(c, 0) for s in self.stages) for c in COUNTERS},
+            },
+            "stages": self.stages,
+        }
+
+        if self._profiler:
+            self._profiler.disable()
+            tracemalloc.stop()
+            self._profiler.dump_stats(PROFILE_FILE)
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(15)
+            print(out.getvalue())
+            report["profile"] = PROFILE_FILE
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+# ================= ACTIVE RUN =================
+_active = None
+
+
+def start_run(name, profile=False):
+    global _active
+    _active = RunMetrics(name, profile)
+    return _active
+
+
+def stage(name):
+    return _active.stage(name) if _active else nullcontext({})
+
+
+def add(**counters):
+    if _active:
+        _active.add(**counters)
+
+
+def finish_run(path=METRICS_FILE):
+    global _active
+    if not _active:
+        return None
+    run, _active = _active, None
+    report = run.finish(path)
+
+    print(f"✓ Metrics → {path}")
+    for s in report["stages"]:
+        print(f"   {s['name']:<14} {s['wall_s']:>8.3f}s wall {s['cpu_s']:>8.3f}s cpu")
+    return report
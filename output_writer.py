@@ -0,0 +1,106 @@
+"""
+output_writer.py
+----------------
+One output layer for everything the scrape writes under course_data/.
+
+Every writer serializes in memory first, then:
+  - skips the write when the file on disk already has the same bytes
+    (size check, then SHA-256), so an unchanged run leaves nothing for
+    `git add course_data/` to hash
+  - otherwise writes {path}.tmp, fsyncs and renames it over the target,
+    so a crash can never leave a truncated file behind
+
+    output_writer.write_json(path, data, ensure_ascii=False)
+    output_writer.report()   # ✓ Outputs: 3 written (120 KB), 5 unchanged (810 KB skipped)
+
+Bytes written / skipped also land in the active metrics stage.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import metrics
+
+
+class WriteStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.files_written = 0
+        self.files_skipped = 0
+        self.bytes_written = 0
+        self.bytes_skipped = 0
+
+    def record(self, size, written):
+        with self._lock:
+            if written:
+                self.files_written += 1
+                self.bytes_written += size
+            else:
+                self.files_skipped += 1
+                self.bytes_skipped += size
+
+    def summary(self):
+        return {
+            "files_written": self.files_written,
+            "files_skipped": self.files_skipped,
+            "bytes_written": self.bytes_written,
+            "bytes_skipped": self.bytes_skipped,
+        }
+
+
+stats = WriteStats()
+
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+
+def unchanged(path, data):
+    if not os.path.exists(path) or os.path.getsize(path) != len(data):
+        return False
+    return _sha256_file(path) == hashlib.sha256(data).digest()
+
+
+def write_bytes(path, data):
+    """Atomically replaces `path` with `data` unless it already holds it → True if written."""
+    if unchanged(path, data):
+        stats.record(len(data), False)
+        metrics.add(bytes_skipped=len(data))
+        return False
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    stats.record(len(data), True)
+    metrics.add(bytes_written=len(data))
+    return True
+
+
+def write_text(path, text):
+    return write_bytes(path, text.encode("utf-8"))
+
+
+def write_json(path, obj, indent=2, ensure_ascii=True, **kwargs):
+    """Same bytes json.dump(obj, f, indent=indent, ...) would produce."""
+    return write_text(path, json.dumps(obj, indent=indent, ensure_ascii=ensure_ascii, **kwargs))
+
+
+def report():
+    s = stats.summary()
+    print(
+        f"✓ Outputs: {s['files_written']} written ({s['bytes_written'] / 1024:.0f} KB), "
+        f"{s['files_skipped']} unchanged ({s['bytes_skipped'] / 1024:.0f} KB skipped)"
+    )
+    return s
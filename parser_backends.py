@@ -0,0 +1,162 @@
+"""
+parser_backends.py
+------------------
+Turns the GetList HTML into grid rows for bas4.extract_courses.
+
+Every backend returns the same shape, one tuple per div.ui-grid-row in
+document order:
+
+    (has_hr, [col_strings, col_strings, ...])
+
+where each col_strings is the list of stripped, non-empty text nodes of a
+div whose class contains "ui-grid-col-" (nested cols included, in document
+order) — i.e. exactly what get_text(strip=True) / get_text("\\n", strip=True)
+would join together.
+
+Backends:
+    bs4     reference — BeautifulSoup html.parser tree (the original path)
+    stream  single-pass regex tokenizer, no tree is built
+"""
+
+import re
+from functools import lru_cache
+from html import unescape
+
+from bs4 import BeautifulSoup
+
+
+# ================= REFERENCE (BeautifulSoup) =================
+def bs4_rows(html):
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for row in soup.select("div.ui-grid-row"):
+        cols = row.find_all("div", class_=lambda x: x and "ui-grid-col-" in x)
+        rows.append((
+            row.find("hr") is not None,
+            [list(col.stripped_strings) for col in cols],
+        ))
+    return rows
+
+
+# ================= STREAMING TOKENIZER =================
+# Only the tags that shape rows/cols are tokenized one by one (div, hr);
+# comments and raw-text elements are swallowed whole so nothing inside
+# them counts. Everything between two such tokens is a run of inline
+# markup that is split into text nodes in one go.
+ATTRS = r"""(?:[^>"']|"[^"]*"|'[^']*')*"""
+RE_BLOCK = re.compile(
+    r"<!--.*?-->"
+    r"|<(script|style|template)(?=[\s/>]).*?</\1\s*>"
+    r"|<(/?)(div|hr)(?=[\s/>])(" + ATTRS + r")>",
+    re.S | re.I,
+)
+RE_INLINE_TAG = re.compile(r"<(?:/?[a-zA-Z]" + ATTRS + r"|![^>]*|\?[^>]*)>")
+RE_CLASS = re.compile(r"""(?:^|\s)class\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+
+
+@lru_cache(maxsize=10000)
+def _div_kind(attrs):
+    """attrs string → (is_row, is_col, self_closing); grid markup repeats, so memoize."""
+    m = RE_CLASS.search(attrs)
+    cls = (m.group(1) or m.group(2) or m.group(3) or "") if m else ""
+    return (
+        "ui-grid-row" in cls.split(),
+        "ui-grid-col-" in cls,
+        attrs.rstrip().endswith("/"),
+    )
+
+
+def _text_nodes(chunk):
+    pieces = RE_INLINE_TAG.split(chunk) if "<" in chunk else (chunk,)
+    nodes = []
+    for piece in pieces:
+        if "&" in piece:
+            piece = unescape(piece)
+        piece = piece.strip()
+        if piece:
+            nodes.append(piece)
+    return nodes
+
+
+def stream_rows(html):
+    rows = []
+    stack = []        # one entry per open div: (row or None, col or None)
+    open_rows = []
+    open_cols = []
+    pos = 0
+
+    for m in RE_BLOCK.finditer(html):
+        if open_cols and m.start() > pos:
+            nodes = _text_nodes(html[pos:m.start()])
+            if nodes:
+                for col in open_cols:
+                    col.extend(nodes)
+        pos = m.end()
+
+        tag = m.group(3)
+        if tag is None:  # comment / script / style
+            continue
+        tag = tag.lower()
+        closing = m.group(2)
+
+        if tag == "hr":
+            if not closing:
+                for row in open_rows:
+                    row[0] = True
+            continue
+
+        if closing:
+            if stack:
+                row, col = stack.pop()
+                if row is not None:
+                    open_rows.pop()
+                if col is not None:
+                    open_cols.pop()
+            continue
+
+        is_row, is_col, self_closing = _div_kind(m.group(4))
+        row = col = None
+        if is_row:
+            row = [False, []]
+            rows.append(row)
+        if is_col:
+            # registered before this div's own row opens: find_all only
+            # looks at descendants, never at the row itself
+            col = []
+            for r in open_rows:
+                r[1].append(col)
+        if row is not None:
+            open_rows.append(row)
+        if col is not None:
+            open_cols.append(col)
+
+        if self_closing:  # <div/> opens and closes
+            if row is not None:
+                open_rows.pop()
+            if col is not None:
+                open_cols.pop()
+            continue
+        stack.append((row, col))
+
+    if open_cols and pos < len(html):
+        nodes = _text_nodes(html[pos:])
+        for col in open_cols:
+            col.extend(nodes)
+
+    return [(has_hr, cols) for has_hr, cols in rows]
+
+
+# ================= REGISTRY =================
+BACKENDS = {
+    "bs4": bs4_rows,
+    "stream": stream_rows,
+}
+REFERENCE_BACKEND = "bs4"
+DEFAULT_BACKEND = "stream"
+
+
+def get_backend(name=None):
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]
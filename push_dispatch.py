@@ -0,0 +1,162 @@
+"""
+push_dispatch.py
+----------------
+Concurrent web-push fan-out for the notifier.
+
+Both notifier paths used to call pywebpush.webpush() once per
+subscription, one after another, each with timeout=10, so a handful of
+dead endpoints could hold the run for minutes. PushDispatcher sends a
+whole batch at once:
+
+  - a bounded thread pool (`workers`) over one shared requests.Session,
+    so connections to each push service are reused
+  - VAPID headers signed once per push-service origin (scheme://host,
+    the JWT "aud") and reused until an hour before they expire, instead
+    of an ES256 signature per message
+  - an overall deadline: whatever has not finished by then is reported
+    as "timeout" (started) or "skipped" (never started), and every
+    request's own timeout is capped by the time left
+
+    pusher = PushDispatcher(private_key, {"sub": "mailto:..."})
+    outcomes = pusher.send_all([(subscription, payload_dict), ...])
+    # → [{"endpoint", "status": sent|gone|failed|timeout|skipped, "code", "error", "latency"}]
+
+"gone" is a 404/410 from the push service: the subscription no longer
+exists. KEEP_STATUSES are the outcomes that say nothing against the
+endpoint (a run deadline is not the endpoint's fault). The notifier's
+cleanup only drops endpoints for which is_dead() holds: "gone", or a
+"failed" the push service answered with a 4xx that will not change on
+retry. Exceptions (network errors) and 5xx / 408 / 429 are transient.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from py_vapid import Vapid
+from pywebpush import WebPusher
+
+WORKERS = 16
+TIMEOUT_SECS = 10
+DEADLINE_SECS = 60
+VAPID_TTL_SECS = 12 * 60 * 60
+VAPID_REFRESH_SECS = 60 * 60   # re-sign when less than this is left
+KEEP_STATUSES = {"sent", "skipped", "timeout"}
+RETRYABLE_CODES = {408, 429}
+
+
+def is_dead(outcome):
+    """True when the outcome condemns the subscription itself, not just this attempt."""
+    status = outcome["status"]
+    if status in KEEP_STATUSES:
+        return False
+    if status == "gone":
+        return True
+    code = outcome.get("code")
+    return code is not None and 400 <= code < 500 and code not in RETRYABLE_CODES
+
+
+def origin(endpoint):
+    url = urlparse(endpoint)
+    return f"{url.scheme}://{url.netloc}"
+
+
+class PushDispatcher:
+    def __init__(self, private_key, claims, workers=WORKERS, timeout=TIMEOUT_SECS, deadline=DEADLINE_SECS):
+        self.private_key = private_key
+        self.claims = dict(claims)
+        self.workers = workers
+        self.timeout = timeout
+        self.deadline = deadline
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.signatures = 0
+        self._vapid = None
+        self._headers = {}   # origin → (expires_at, headers)
+        self._lock = threading.Lock()
+
+    # ================= VAPID =================
+    def vapid_headers(self, endpoint):
+        """Authorization headers for this endpoint's push service, signed once per origin."""
+        aud = origin(endpoint)
+        now = time.time()
+        with self._lock:
+            cached = self._headers.get(aud)
+            if cached and cached[0] - now > VAPID_REFRESH_SECS:
+                return dict(cached[1])
+            if self._vapid is None:
+                self._vapid = Vapid.from_string(private_key=self.private_key)
+            expires = int(now) + VAPID_TTL_SECS
+            headers = self._vapid.sign({**self.claims, "aud": aud, "exp": expires})
+            self._headers[aud] = (expires, headers)
+            self.signatures += 1
+            return dict(headers)
+
+    # ================= SEND =================
+    def send_one(self, subscription, payload, timeout=None):
+        endpoint = subscription["endpoint"]
+        t0 = time.perf_counter()
+        try:
+            response = WebPusher(subscription, requests_session=self.session).send(
+                json.dumps(payload),
+                headers=self.vapid_headers(endpoint),
+                timeout=timeout or self.timeout,
+            )
+        except Exception as e:
+            return {"endpoint": endpoint, "status": "failed", "code": None,
+                    "error": str(e), "latency": time.perf_counter() - t0}
+
+        code = response.status_code
+        if code <= 202:
+            status = "sent"
+        elif code in (404, 410):
+            status = "gone"
+        else:
+            status = "failed"
+        return {"endpoint": endpoint, "status": status, "code": code,
+                "error": None if status == "sent" else (response.text or "")[:200],
+                "latency": time.perf_counter() - t0}
+
+    def send_all(self, jobs):
+        """jobs: [(subscription, payload)] → one outcome per job, in the same order."""
+        if not jobs:
+            return []
+        started_at = time.monotonic()
+        stop_at = started_at + self.deadline
+        started = set()
+
+        def run(i, subscription, payload):
+            left = stop_at - time.monotonic()
+            if left <= 0:
+                return None
+            started.add(i)
+            return self.send_one(subscription, payload, timeout=min(self.timeout, left))
+
+        pool = ThreadPoolExecutor(max_workers=min(self.workers, len(jobs)), thread_name_prefix="push")
+        futures = [pool.submit(run, i, sub, payload) for i, (sub, payload) in enumerate(jobs)]
+        wait(futures, timeout=max(0.0, stop_at - time.monotonic()))
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        outcomes = []
+        for i, ((sub, _), fut) in enumerate(zip(jobs, futures)):
+            if fut.done() and not fut.cancelled() and fut.result() is not None:
+                outcomes.append(fut.result())
+            else:
+                outcomes.append({"endpoint": sub["endpoint"], "status": "timeout" if i in started else "skipped",
+                                 "code": None, "error": "deadline reached", "latency": None})
+        return outcomes
+
+    def close(self):
+        self.session.close()
+
+
+def summarize(outcomes):
+    counts = {}
+    for o in outcomes:
+        counts[o["status"]] = counts.get(o["status"], 0) + 1
+    return ", ".join(f"{n} {status}" for status, n in sorted(counts.items())) or "none"
@@ -0,0 +1,235 @@
+"""
+seat_history.py
+---------------
+Per-section seat history. {term}_courses.json only holds the latest
+available / capacity; every scrape also appends a snapshot here so we can
+see how fast sections fill.
+
+Storage (per term, in seat_data/ — not committed: the scraper workflow
+commits course_data/ on every run, and a growing binary there would add
+a new blob to the repo each time. On GitHub Actions, scraper.yml carries
+seat_data/ from run to run with actions/cache):
+    {term}_seats.bin    append-only records, one per scrape:
+                            <d I   epoch seconds, n changed sections
+                            n × uint32  slot   (index into "uniques")
+                            n × int16   Δ available
+                            n × int16   Δ capacity
+                        little-endian; sections that did not change cost
+                        nothing, the first record holds the full catalog
+    {term}_seats.json   uniques (slot → unique), the last snapshot's
+                        values and the committed .bin length. Appending
+                        is O(sections), never a replay of the history.
+
+A section missing from a scrape is recorded as 0 / 0. Values are clamped
+to ±16383 so every delta fits in an int16.
+
+Queries:
+    opened_since(term, t)   sections whose seats went 0 → >0 after epoch t
+                            (streams the records, no NumPy needed)
+    load_arrays(term)       NumPy times[k], available[k, slot], capacity[k, slot]
+                            (NumPy is optional and not in requirements.txt:
+                            pip install numpy to use this one)
+
+Run from the FCCU-Advisior root:
+    python seat_history.py 2026FA               # summary
+    python seat_history.py 2026FA --opened 60   # opened in the last 60 min
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+
+import metrics
+import output_writer
+
+try:
+    import numpy as np
+except ImportError:  # only load_arrays needs it
+    np = None
+
+DATA_DIR = "seat_data"
+HEADER = struct.Struct("<dI")
+SEAT_LIMIT = 16383
+SWAP = sys.byteorder != "little"
+
+
+def _paths(term_code, data_dir=DATA_DIR):
+    base = os.path.join(data_dir, f"{term_code}_seats")
+    return base + ".bin", base + ".json"
+
+
+def _seat(value):
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return 0
+    return max(-SEAT_LIMIT, min(SEAT_LIMIT, n))
+
+
+def _le_bytes(arr):
+    if SWAP:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode, data):
+    arr = array(typecode)
+    arr.frombytes(data)
+    if SWAP:
+        arr.byteswap()
+    return arr
+
+
+def _empty_state():
+    return {"uniques": [], "available": [], "capacity": [], "snapshots": 0, "bytes": 0}
+
+
+def load_state(term_code, data_dir=DATA_DIR):
+    bin_path, meta_path = _paths(term_code, data_dir)
+    if not os.path.exists(meta_path):
+        return _empty_state()
+    with open(meta_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    size = os.path.getsize(bin_path) if os.path.exists(bin_path) else 0
+    if size < state["bytes"]:
+        print(f"⚠ {os.path.basename(bin_path)} shorter than its index → starting a new history")
+        return _empty_state()
+    return state
+
+
+# ================= APPEND =================
+def append_snapshot(term_code, courses, timestamp=None, data_dir=DATA_DIR):
+    """Records one scrape → number of sections whose seats changed."""
+    bin_path, meta_path = _paths(term_code, data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    state = load_state(term_code, data_dir)
+    uniques = state["uniques"]
+    slot_of = {u: i for i, u in enumerate(uniques)}
+    prev_avail = state["available"]
+    prev_cap = state["capacity"]
+
+    cur_avail = [0] * len(uniques)
+    cur_cap = [0] * len(uniques)
+    for c in courses:
+        slot = slot_of.get(c["unique"])
+        if slot is None:
+            slot = slot_of[c["unique"]] = len(uniques)
+            uniques.append(c["unique"])
+            cur_avail.append(0)
+            cur_cap.append(0)
+            prev_avail.append(0)
+            prev_cap.append(0)
+        cur_avail[slot] = _seat(c.get("available"))
+        cur_cap[slot] = _seat(c.get("capacity"))
+
+    slots, d_avail, d_cap = array("I"), array("h"), array("h")
+    for slot in range(len(uniques)):
+        da = cur_avail[slot] - prev_avail[slot]
+        dc = cur_cap[slot] - prev_cap[slot]
+        if da or dc:
+            slots.append(slot)
+            d_avail.append(da)
+            d_cap.append(dc)
+
+    record = (
+        HEADER.pack(timestamp if timestamp is not None else time.time(), len(slots))
+        + _le_bytes(slots) + _le_bytes(d_avail) + _le_bytes(d_cap)
+    )
+    with open(bin_path, "ab") as f:
+        # drop a torn record left by a crashed run before appending
+        f.truncate(state["bytes"])
+        f.write(record)
+    metrics.add(bytes_written=len(record))
+
+    state.update({
+        "uniques": uniques,
+        "available": cur_avail,
+        "capacity": cur_cap,
+        "snapshots": state["snapshots"] + 1,
+        "bytes": state["bytes"] + len(record),
+    })
+    output_writer.write_json(meta_path, state, indent=None, ensure_ascii=False, separators=(",", ":"))
+    return len(slots)
+
+
+# ================= READ =================
+def iter_records(term_code, data_dir=DATA_DIR):
+    """Yields (epoch, slots, Δavailable, Δcapacity) for every committed record."""
+    bin_path, _ = _paths(term_code, data_dir)
+    state = load_state(term_code, data_dir)
+    if not os.path.exists(bin_path):
+        return
+    with open(bin_path, "rb") as f:
+        data = f.read(state["bytes"])
+
+    pos = 0
+    while pos + HEADER.size <= len(data):
+        ts, n = HEADER.unpack_from(data, pos)
+        pos += HEADER.size
+        slots = _from_le("I", data[pos:pos + 4 * n])
+        pos += 4 * n
+        d_avail = _from_le("h", data[pos:pos + 2 * n])
+        pos += 2 * n
+        d_cap = _from_le("h", data[pos:pos + 2 * n])
+        pos += 2 * n
+        yield ts, slots, d_avail, d_cap
+
+
+def opened_since(term_code, since, data_dir=DATA_DIR):
+    """{unique: epoch of the latest 0 → >0 transition} for transitions after `since`."""
+    uniques = load_state(term_code, data_dir)["uniques"]
+    avail = [0] * len(uniques)
+    opened = {}
+    first = True
+    for ts, slots, d_avail, _ in iter_records(term_code, data_dir):
+        for slot, delta in zip(slots, d_avail):
+            before = avail[slot]
+            avail[slot] = before + delta
+            # the first snapshot is the baseline, not a transition
+            if not first and ts >= since and before <= 0 < avail[slot]:
+                opened[uniques[slot]] = ts
+        first = False
+    return opened
+
+
+def load_arrays(term_code, data_dir=DATA_DIR):
+    """→ (uniques, times[k], available[k, slot], capacity[k, slot]) as NumPy arrays."""
+    if np is None:
+        raise RuntimeError("numpy is not installed (pip install numpy) — use opened_since / iter_records instead")
+
+    uniques = load_state(term_code, data_dir)["uniques"]
+    records = list(iter_records(term_code, data_dir))
+    times = np.array([r[0] for r in records], dtype=np.float64)
+    d_avail = np.zeros((len(records), len(uniques)), dtype=np.int32)
+    d_cap = np.zeros_like(d_avail)
+    for k, (_, slots, da, dc) in enumerate(records):
+        idx = np.frombuffer(slots, dtype=np.uint32)
+        d_avail[k, idx] = np.frombuffer(da, dtype=np.int16)
+        d_cap[k, idx] = np.frombuffer(dc, dtype=np.int16)
+    return uniques, times, np.cumsum(d_avail, axis=0), np.cumsum(d_cap, axis=0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the per-section seat history")
+    parser.add_argument("term", help="term code, e.g. 2026FA")
+    parser.add_argument("--opened", type=float, metavar="MINUTES",
+                        help="list sections whose seats opened in the last MINUTES")
+    args = parser.parse_args()
+
+    bin_path, _ = _paths(args.term)
+    state = load_state(args.term)
+    size = os.path.getsize(bin_path) if os.path.exists(bin_path) else 0
+    print(f"✓ {args.term}: {state['snapshots']} snapshots, {len(state['uniques'])} sections, {size:,} bytes")
+
+    if args.opened is not None:
+        t0 = time.perf_counter()
+        opened = opened_since(args.term, time.time() - args.opened * 60)
+        secs = time.perf_counter() - t0
+        print(f"→ {len(opened)} sections opened in the last {args.opened:g} min ({secs * 1000:.1f} ms)")
+        for unique, ts in sorted(opened.items(), key=lambda kv: kv[1]):
+            print(f"   {unique:<16} {time.strftime('%Y-%m-%d %H:%M', time.localtime(ts))}")
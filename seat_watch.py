@@ -0,0 +1,142 @@
+"""
+seat_watch.py
+-------------
+Long-running seat watcher for registration week.
+
+Instead of waiting for someone to trigger the "Course Scraper" workflow
+(which commits, then chains into supaba.py), this polls the catalog in a
+loop with the same bas4 fetch/parse path and runs the notifier logic
+in-process as soon as the catalog changes.
+
+The poll interval adapts between MIN_INTERVAL and MAX_INTERVAL:
+  - more pending watches      → poll faster
+  - catalog changing often    → poll faster
+  - nothing pending / calm    → back off to MAX_INTERVAL
+  - fetch errors              → exponential back-off
+
+Needs the same env vars as supaba.py (SUPABASE_URL, SUPABASE_KEY, ...).
+
+Run from the FCCU-Advisior root:
+    python seat_watch.py
+    python seat_watch.py --min 20 --max 300
+"""
+
+import argparse
+import random
+import time
+
+import bas4
+
+MIN_INTERVAL = 30      # seconds
+MAX_INTERVAL = 600
+WATCH_SATURATION = 50  # this many pending watches counts as "fully busy"
+URGENCY_GAIN = 4.0     # urgency 2.0 → MAX_INTERVAL / 9
+RATE_ALPHA = 0.3       # EWMA weight of the latest poll's change flag
+JITTER = 0.1
+
+
+def next_interval(change_rate, pending, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+    """
+    change_rate: EWMA of "did the catalog change this poll" (0..1)
+    pending:     number of seat + new-section watches still waiting
+    """
+    if pending <= 0:
+        return max_interval
+
+    urgency = change_rate + min(pending, WATCH_SATURATION) / WATCH_SATURATION  # 0..2
+    interval = max_interval / (1 + URGENCY_GAIN * urgency)
+    interval *= 1 + random.uniform(-JITTER, JITTER)
+    return max(min_interval, min(max_interval, interval))
+
+
+def count_pending(notifier):
+    seat = notifier.get_pending_notifications()
+    section = notifier.get_pending_new_section_notifications()
+    return seat, section
+
+
+def on_change(notifier, courses, term_code, term_name, digest, seat, section):
+    """Persist the new snapshot, then alert in-process. Returns watches still pending."""
+    # same outputs as a bas4.py run, so its next run's "Catalog unchanged" is true
+    bas4.save_outputs(term_code, term_name, courses, digest)
+
+    courses_by_unique = {c["unique"]: c for c in courses}
+    notifier.subscription_cache.clear()  # devices may have changed since the last round
+    seat_fired = notifier.seat_alerts(courses_by_unique, seat)
+    section_fired = notifier.new_section_alerts(section)
+    notifier.send_alerts(seat_fired + section_fired)
+    # statuses must land before the next poll re-reads the pending watches
+    notifier.flush_outbox()
+    print(f"✓ Notifier ran: {len(seat_fired)} seat / {len(section_fired)} section alerts sent")
+    # every alert sent marks its watch; the rest are still waiting
+    return len(seat) - len(seat_fired) + len(section) - len(section_fired)
+
+
+def watch(min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, max_polls=None, backend=None):
+    import supaba as notifier  # needs SUPABASE_* env vars
+
+    session, token, terms = bas4.open_catalog_session()
+    term_name, term_code = bas4.fetch_latest_term(terms)
+
+    last_digest = bas4.cached_fingerprint(term_code)
+    change_rate = 0.0
+    error_streak = 0
+    polls = 0
+
+    print(f"→ Watching {term_name} ({term_code}), interval {min_interval}-{max_interval}s")
+
+    while max_polls is None or polls < max_polls:
+        polls += 1
+        try:
+            try:
+                html = bas4.fetch_courses(session, token, term_code)
+            except bas4.TokenRejected:
+                bas4.clear_session_cache()
+                session, token, _ = bas4.open_catalog_session(use_cache=False)
+                html = bas4.fetch_courses(session, token, term_code)
+
+            # statuses an earlier run or poll could not write go first, so they
+            # are not re-sent (a no-op unless the state file exists)
+            notifier.writes.replay()
+            seat, section = count_pending(notifier)
+            pending = len(seat) + len(section)
+
+            digest = bas4.html_fingerprint([html])
+            changed = digest != last_digest
+            if changed:
+                courses = bas4.parse_courses_from_html(html, backend)
+                pending = on_change(notifier, courses, term_code, term_name, digest, seat, section)
+                last_digest = digest
+
+            change_rate = RATE_ALPHA * changed + (1 - RATE_ALPHA) * change_rate
+            interval = next_interval(change_rate, pending, min_interval, max_interval)
+            error_streak = 0
+
+            state = "changed" if changed else "unchanged"
+            print(f"✓ Poll {polls}: {state} | rate {change_rate:.2f} | pending {pending} | next in {interval:.0f}s")
+
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            error_streak += 1
+            interval = min(max_interval, min_interval * 2 ** error_streak)
+            print(f"⚠ Poll {polls} failed ({e}) → retry in {interval:.0f}s")
+
+        if max_polls is not None and polls >= max_polls:
+            break
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poll the catalog and send seat alerts in-process")
+    parser.add_argument("--min", type=float, default=MIN_INTERVAL, help="shortest poll interval (s)")
+    parser.add_argument("--max", type=float, default=MAX_INTERVAL, help="longest poll interval (s)")
+    parser.add_argument("--polls", type=int, default=None, help="stop after this many polls")
+    parser.add_argument("--parser", choices=sorted(bas4.parser_backends.BACKENDS),
+                        default=bas4.parser_backends.DEFAULT_BACKEND, help="HTML parser backend")
+    args = parser.parse_args()
+
+    try:
+        watch(args.min, args.max, args.polls, args.parser)
+    except KeyboardInterrupt:
+        print("\n✓ Watcher stopped")
@@ -0,0 +1,199 @@
+"""
+section_index.py
+----------------
+On-disk lookup index for the notifier: unique → available / capacity /
+course_name, written by the scraper as course_data/{term}_sections.idx.
+
+The notifier only needs a handful of sections per run (the ones with
+pending alerts), so instead of parsing the whole term file it mmaps this
+index and binary-searches it. Only the pages touched by the search are
+read, so cold start and memory stay flat as the catalog grows.
+
+Layout (little-endian):
+    b"FCSI" + version
+    uint32 header size + JSON header   rows, SHA-256 of the JSON it was built from
+    rows × 16-byte entries, sorted by the UTF-8 bytes of unique:
+        uint32 key offset, uint16 key length,
+        int16 available, int16 capacity,
+        uint32 name offset, uint16 name length
+    string blob (uniques and course names)
+
+    with SectionIndex.open("2026FA") as index:
+        index.get("ARTS 101/A")  # {"unique", "course_name", "available", "capacity"}
+
+The .idx files are committed with the rest of course_data/, so the
+notifier job's fresh checkout has them. is_fresh() does not read the
+term JSON: bas4 records the JSON's SHA-256 in scrape_fingerprint.json
+after every output is written, and the index is used only while its
+header holds that same hash. A scrape that died before saving its
+fingerprint falls back to the JSON; a hand edit of the JSON alone is not
+noticed until the next scrape.
+
+Run from the FCCU-Advisior root:
+    python section_index.py 2026FA "ARTS 101/A" ...
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+import output_writer
+
+DATA_DIR = "course_data"
+FINGERPRINT_FILE = "scrape_fingerprint.json"  # written by bas4.save_fingerprint
+MAGIC = b"FCSI\x01"
+U32 = struct.Struct("<I")
+ENTRY = struct.Struct("<IHhhIH")
+SEAT_LIMIT = 32767
+
+
+def index_path(term_code, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"{term_code}_sections.idx")
+
+
+def _seat(value):
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return 0
+    return max(-SEAT_LIMIT, min(SEAT_LIMIT, n))
+
+
+# ================= WRITE =================
+def write_index(term_code, courses, source_sha256=None, data_dir=DATA_DIR):
+    rows = {}
+    for c in courses:
+        if c.get("unique"):
+            rows[c["unique"].encode("utf-8")] = c  # last row wins, like the notifier's dict
+    keys = sorted(rows)
+
+    header = json.dumps({"rows": len(keys), "source_sha256": source_sha256}).encode("utf-8")
+    table_start = len(MAGIC) + U32.size + len(header)
+    blob_start = table_start + ENTRY.size * len(keys)
+
+    entries, blob = [], bytearray()
+    for key in keys:
+        c = rows[key]
+        name = (c.get("course_name") or "").encode("utf-8")
+        key_off = blob_start + len(blob)
+        blob += key
+        name_off = blob_start + len(blob)
+        blob += name
+        entries.append(ENTRY.pack(
+            key_off, len(key), _seat(c.get("available")), _seat(c.get("capacity")),
+            name_off, len(name),
+        ))
+
+    path = index_path(term_code, data_dir)
+    output_writer.write_bytes(path, MAGIC + U32.pack(len(header)) + header + b"".join(entries) + blob)
+    return path
+
+
+def recorded_source(term_code, data_dir=DATA_DIR):
+    """SHA-256 of the {term}_courses.json the last completed scrape wrote, or None."""
+    try:
+        with open(os.path.join(data_dir, FINGERPRINT_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get(term_code, {}).get("courses_sha256")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def is_fresh(term_code, data_dir=DATA_DIR):
+    """True when the index was built from the JSON the last completed scrape wrote."""
+    path = index_path(term_code, data_dir)
+    if not os.path.exists(path):
+        return False
+    try:
+        with open(path, "rb") as f:
+            header = _read_header(f.read(4096))[0]
+    except (ValueError, struct.error, UnicodeDecodeError):
+        return False
+    built_from = header.get("source_sha256")
+    return built_from is not None and built_from == recorded_source(term_code, data_dir)
+
+
+def _read_header(buf):
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a section index")
+    (size,) = U32.unpack_from(buf, len(MAGIC))
+    start = len(MAGIC) + U32.size
+    return json.loads(buf[start:start + size].decode("utf-8")), start + size
+
+
+# ================= READ =================
+class SectionIndex:
+    """Read-only mmap view; .get() mirrors the notifier's courses_by_unique dict."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header, self._table = _read_header(self._map[:4096])
+        self.rows = header["rows"]
+
+    @classmethod
+    def open(cls, term_code, data_dir=DATA_DIR):
+        return cls(index_path(term_code, data_dir))
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self._map, self._table + i * ENTRY.size)
+
+    def _key(self, entry):
+        return self._map[entry[0]:entry[0] + entry[1]]
+
+    def get(self, unique, default=None):
+        if not unique:
+            return default
+        key = unique.encode("utf-8")
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            probe = self._key(entry)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                _, _, available, capacity, name_off, name_len = entry
+                return {
+                    "unique": unique,
+                    "course_name": self._map[name_off:name_off + name_len].decode("utf-8"),
+                    "available": available,
+                    "capacity": capacity,
+                }
+        return default
+
+    def __contains__(self, unique):
+        return self.get(unique) is not None
+
+    def __len__(self):
+        return self.rows
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python section_index.py TERM UNIQUE [UNIQUE ...]")
+        sys.exit(1)
+
+    term, wanted = sys.argv[1], sys.argv[2:]
+    t0 = time.perf_counter()
+    with SectionIndex.open(term) as index:
+        opened = time.perf_counter() - t0
+        for unique in wanted:
+            t1 = time.perf_counter()
+            row = index.get(unique)
+            print(f"→ {unique}: {row} ({(time.perf_counter() - t1) * 1e6:.0f} µs)")
+    print(f"✓ {len(index)} sections, opened in {opened * 1000:.2f} ms")
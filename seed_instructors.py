@@ -2,6 +2,8 @@ import json
 import os
 from supabase import create_client
 
+import instructor_names
+
 # ================= CREDENTIALS =================
 # Option A — Direct (local dev only, do NOT commit with real values):
 # SUPABASE_URL = "https://xxxx.supabase.co"
@@ -48,6 +50,10 @@ with open(SOURCE_FILE, "r", encoding="utf-8") as f:
 
 print(f"→ Instructors in JSON: {len(instructors)}")
 
+# name-resolution index written by bas4.py (see instructor_names.py)
+names = instructor_names.load()
+print(f"→ Name index   : {len(names)} instructors")
+
 
 
 # ================= BUILD ROWS WITH dept_key =================
@@ -78,19 +84,29 @@ existing_resp = (
     .execute()
 )
 
-# lookup key: "name|dept_key" → id
-existing_map = {
-    f"{row['name']}|{row['dept_key']}": row["id"]
-    for row in (existing_resp.data or [])
-}
+# lookup key: "canonical name|dept_key" → id
+# rows seeded under another spelling ("A  Rehman", "S. Suleman") resolve to
+# the same key, so they get updated instead of duplicated
+existing_map = {}
+duplicates = []
+for row in sorted(existing_resp.data or [], key=lambda r: r["id"]):
+    lookup_key = f"{names.canonical(row['name'], row['dept_key'] or None)}|{row['dept_key']}"
+    if lookup_key in existing_map:
+        duplicates.append((row["id"], row["name"], existing_map[lookup_key]))
+        continue
+    existing_map[lookup_key] = row["id"]
 print(f"   Found {len(existing_map)} existing rows in Supabase")
+if duplicates:
+    print(f"   ⚠ {len(duplicates)} rows duplicate another spelling (left untouched):")
+    for row_id, name, kept_id in duplicates:
+        print(f"      id {row_id} ({name!r}) → same instructor as id {kept_id}")
 
 # ================= SPLIT: UPDATE vs INSERT =================
 to_insert = []
 to_update = []
 
 for row in rows:
-    lookup_key = f"{row['name']}|{row['dept_key']}"
+    lookup_key = f"{names.canonical(row['name'], row['dept_key'] or None)}|{row['dept_key']}"
 
     course_patch = {
         "departments":     row["departments"],
@@ -0,0 +1,84 @@
+"""
+subscriptions.py
+----------------
+Run-scoped cache of users.Notification_IDs for the notifier.
+
+Instead of one users.select(...).eq("roll_number", ...).single() per
+alert, the notifier collects every roll number it is about to alert and
+prefetch()es them with a few .in_("roll_number", [...]) queries. Every
+later get() for those users is a dict hit, and pruned subscription lists
+are written back into the cache so the rest of the run sees them.
+
+    subs = SubscriptionCache(supabase)
+    subs.prefetch(roll_numbers)      # ceil(n / batch_size) queries
+    subs.get(roll_number)            # → list of subscription dicts
+    subs.round_trips                 # queries issued so far
+"""
+
+USERS_TABLE = "users"
+BATCH_SIZE = 200  # roll numbers per in_() query, keeps the URL well under limits
+
+
+def _key(roll_number):
+    return str(roll_number).strip()
+
+
+class SubscriptionCache:
+    def __init__(self, client, batch_size=BATCH_SIZE):
+        self.client = client
+        self.batch_size = batch_size
+        self.round_trips = 0
+        self.failed = 0
+        self._subs = {}
+
+    def __len__(self):
+        return len(self._subs)
+
+    def __contains__(self, roll_number):
+        return _key(roll_number) in self._subs
+
+    def prefetch(self, roll_numbers):
+        """Fetches every roll number not cached yet → queries issued."""
+        wanted = list(dict.fromkeys(
+            _key(r) for r in roll_numbers if r is not None and _key(r) not in self._subs
+        ))
+        queries = 0
+        for i in range(0, len(wanted), self.batch_size):
+            batch = wanted[i:i + self.batch_size]
+            queries += 1
+            self.round_trips += 1
+            try:
+                res = (
+                    self.client
+                    .table(USERS_TABLE)
+                    .select("roll_number, Notification_IDs")
+                    .in_("roll_number", batch)
+                    .execute()
+                )
+            except Exception as e:
+                # left uncached: get() retries these one by one
+                self.failed += len(batch)
+                print(f"⚠ Subscription batch failed ({len(batch)} users): {e}")
+                continue
+            for row in res.data or []:
+                self._subs[_key(row.get("roll_number"))] = row.get("Notification_IDs") or []
+            for r in batch:
+                self._subs.setdefault(r, [])  # no users row → no devices
+        return queries
+
+    def get(self, roll_number):
+        key = _key(roll_number)
+        if key not in self._subs:
+            self.prefetch([key])
+        return self._subs.get(key) or []
+
+    def clear(self):
+        """Forgets every cached user, for long-running callers that alert in rounds."""
+        self._subs.clear()
+
+    def set(self, roll_number, subscriptions):
+        """Keeps the cache in step after the notifier rewrites a user's Notification_IDs."""
+        self._subs[_key(roll_number)] = subscriptions
+
+    def summary(self):
+        return f"{self.round_trips} subscription queries for {len(self._subs)} users"
@@ -3,10 +3,15 @@ import os
 import json
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from pywebpush import webpush, WebPushException
+import change_log
+import term_store
+import section_index
+import subscriptions
+import write_batch
+import mail_pool
+import push_dispatch
 
 # ---------------- CONFIG ----------------
 
@@ -18,6 +23,8 @@ SENDGRID_API_KEY = os.environ.get("SENDGRID_API_KEY")
 VAPID_PRIVATE_KEY = os.environ.get("VAPID_PRIVATE_KEY")
 FROM_EMAIL = "ahmadsiddique.webdev@gmail.com"
 
+DIGEST_PUSH_ITEMS = 3  # alerts spelled out in a digest push before "(+n more)"
+
 VAPID_CLAIMS = {
     "sub": f"mailto:{FROM_EMAIL}"
 }
@@ -30,6 +37,18 @@ if not all([SUPABASE_URL, SUPABASE_KEY, SENDGRID_API_KEY]):
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# users.Notification_IDs, fetched in batches and kept for the whole run
+subscription_cache = subscriptions.SubscriptionCache(supabase)
+
+# status updates and subscription prunes, flushed in bulk
+writes = write_batch.WriteBatcher(supabase)
+
+# authenticated SMTP connections kept open for the whole run
+mailer = mail_pool.SMTPPool("smtp.gmail.com", 587, FROM_EMAIL, SENDGRID_API_KEY)
+
+# concurrent web push, VAPID signed once per push service
+pusher = push_dispatch.PushDispatcher(VAPID_PRIVATE_KEY, VAPID_CLAIMS) if VAPID_PRIVATE_KEY else None
+
 
 # ---------------- SUPABASE ----------------
 def get_pending_notifications():
@@ -44,10 +63,7 @@ def get_pending_notifications():
 
 
 def mark_as_sent(notification_id):
-    supabase.table("seed_availability_notifications") \
-        .update({"status": "sent"}) \
-        .eq("id", notification_id) \
-        .execute()
+    writes.mark("seed_availability_notifications", notification_id)
 
 
 # ---------------- COURSE DATA ----------------
@@ -64,10 +80,8 @@ def get_latest_term_code():
 
 
 def load_courses_for_term(term_code):
-    path = os.path.join(COURSE_DATA_DIR, f"{term_code}_courses.json")
-
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # binary copy when it is current, else the JSON
+    data = term_store.load_term(term_code, COURSE_DATA_DIR)
 
     if isinstance(data, str):
         data = json.loads(data)
@@ -85,274 +99,242 @@ def load_courses_for_term(term_code):
 
 # ---------------- EMAIL ----------------
 def send_email(to_email, subject, body):
-    """Send an email using Gmail SMTP."""
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = FROM_EMAIL
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()  # Secure connection
-        server.login(FROM_EMAIL, SENDGRID_API_KEY)
-        server.sendmail(FROM_EMAIL, to_email, msg.as_string())
-        server.quit()
-        print(f"✅ Email sent ({to_email})")
-    except Exception as e:
-        print(f"❌ Email failed ({to_email})")
+    """Queue an email on the pooled Gmail SMTP connections (sent concurrently)."""
+    msg = MIMEMultipart()
+    msg['From'] = FROM_EMAIL
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
 
+    def report(fut):
+        if fut.exception() is None:
+            print(f"✅ Email sent ({to_email}) in {fut.result() * 1000:.0f} ms")
+        else:
+            print(f"❌ Email failed ({to_email})")
 
-# ---------------- NOTIFICATIONS ----------------
-def send_course_notifications(roll_number, course, unique):
-    course_name = course.get("course_name", "Unknown Course")
-    
-    # 1. Send Email
-    email = f"{str(roll_number)}@formanite.fccollege.edu.pk"
-    subject = f"Seat Available: {course_name}"
-    body = (
-        f"Good news!\n\n"
-        f"Seats are now available for:\n"
-        f"{course_name} ({unique})\n\n"
-        f"Please log in to the portal and register ASAP.\n\n"
-        f"— FCCU Course Notifier"
-    )
-    send_email(email, subject, body)
+    mailer.submit(FROM_EMAIL, to_email, msg.as_string()).add_done_callback(report)
 
-    # 2. Send Push Notifications
-    try:
-        res = (
-            supabase
-            .table("users")
-            .select("Notification_IDs")
-            .eq("roll_number", roll_number)
-            .single()
-            .execute()
-        )
-        data = res.data
-    except Exception as e:
-        data = None
 
-    notification_ids = []
-    if data and data.get("Notification_IDs"):
-        notification_ids = data.get("Notification_IDs")
+# ---------------- PUSH ----------------
+def push_batch(roll_number, payload, label):
+    """One user's deduplicated subscriptions, each paired with payload, ready for send_pushes."""
+    notification_ids = subscription_cache.get(roll_number)
 
     # Unique subscriptions
     seen = set()
-    unique_subs = []
+    subs = []
     for sub in notification_ids:
         if not isinstance(sub, dict): continue
         endpoint = sub.get("endpoint")
-        if endpoint and endpoint not in seen:
+        if endpoint and endpoint not in seen and sub.get("keys"):
             seen.add(endpoint)
-            unique_subs.append(sub)
-
-    push_sent_count = 0
-    valid_subs = []
-    
-    payload = {
-        "title": "Seat Available! 🎉",
-        "body": f"Seats are now available for {course_name} ({unique})."
-    }
+            subs.append(sub)
+
+    jobs = [
+        ({
+            "endpoint": sub["endpoint"],
+            "keys": {
+                "p256dh": sub["keys"].get("p256dh", ""),
+                "auth": sub["keys"].get("auth", "")
+            }
+        }, payload)
+        for sub in subs
+    ]
+    return {"roll_number": roll_number, "label": label, "notification_ids": notification_ids, "subs": subs, "jobs": jobs}
 
-    needs_cleanup = len(notification_ids) > 10
 
-    if not VAPID_PRIVATE_KEY:
+def send_pushes(batches):
+    """Sends every batch's pushes in one concurrent fan-out, then prunes dead subscriptions."""
+    if not batches:
+        return
+    if pusher is None:
         print("⚠️ VAPID_PRIVATE_KEY not set. Skipping push notifications.")
-    else:
-        for sub in unique_subs:
-            if not sub.get("endpoint") or not sub.get("keys"):
-                continue
-                
-            success = False
-            try:
-                webpush(
-                    subscription_info={
-                        "endpoint": sub["endpoint"],
-                        "keys": {
-                            "p256dh": sub["keys"].get("p256dh", ""),
-                            "auth": sub["keys"].get("auth", "")
-                        }
-                    },
-                    data=json.dumps(payload),
-                    vapid_private_key=VAPID_PRIVATE_KEY,
-                    vapid_claims=VAPID_CLAIMS,
-                    timeout=10
-                )
-                push_sent_count += 1
-                success = True
-            except WebPushException as e:
-                success = False
-            except Exception as e:
-                success = False
-
-            if success or not needs_cleanup:
-                valid_subs.append(sub)
-
-    print(f"✅ Pushes sent: {push_sent_count} ({roll_number})")
-
-    if needs_cleanup and len(valid_subs) < len(notification_ids):
-        try:
-            supabase.table("users").update({"Notification_IDs": valid_subs}).eq("roll_number", roll_number).execute()
+        return
+
+    outcomes = pusher.send_all([job for batch in batches for job in batch["jobs"]])
+    print(f"✓ Push fan-out: {len(outcomes)} endpoints ({push_dispatch.summarize(outcomes)})")
+
+    i = 0
+    for batch in batches:
+        roll_number = batch["roll_number"]
+        results = outcomes[i:i + len(batch["jobs"])]
+        i += len(batch["jobs"])
+
+        needs_cleanup = len(batch["notification_ids"]) > 10
+        push_sent_count = sum(1 for o in results if o["status"] == "sent")
+        valid_subs = [
+            sub for sub, o in zip(batch["subs"], results)
+            if not needs_cleanup or not push_dispatch.is_dead(o)
+        ]
+        print(f"✅ {batch['label']}: {push_sent_count} ({roll_number})")
+
+        if needs_cleanup and len(valid_subs) < len(batch["notification_ids"]):
+            writes.prune(roll_number, valid_subs)
+            subscription_cache.set(roll_number, valid_subs)
             print(f"🧹 IDs cleaned ({roll_number})")
-        except Exception as e:
-            print(f"❌ Cleanup failed ({roll_number})")
 
-def process_new_section_notifications(pending_notifs=None):
-    from dateutil.parser import parse as parse_date
-    import datetime
-    
-    if pending_notifs is None:
-        response = (
-            supabase
-            .table("new_section_notifications")
-            .select("*")
-            .eq("status", "pending")
-            .execute()
-        )
-        pending_notifs = response.data or []
-        
-    if not pending_notifs: return
 
-    changes_path = os.path.join(COURSE_DATA_DIR, "latestterm_changes.json")
-    if not os.path.exists(changes_path): return
+# ---------------- ALERTS ----------------
+# an alert is one triggered watch: the row to mark sent plus its message parts
+def seat_alerts(courses_by_unique, notifications):
+    """Pending seat watches whose section now has seats → alerts."""
+    alerts = []
+    for notif in notifications:
+        unique = notif.get("uniqueness")
+
+        course = courses_by_unique.get(unique)
+        if not course:
+            continue
 
-    with open(changes_path, "r", encoding="utf-8") as f:
         try:
-            changes = json.load(f)
-        except json.JSONDecodeError:
-            changes = []
+            available = int(course.get("available", 0))
+        except ValueError:
+            available = 0
+
+        if available > 0:
+            course_name = course.get("course_name", "Unknown Course")
+            alerts.append({
+                "table": "seed_availability_notifications",
+                "id": notif.get("id"),
+                "roll_number": notif.get("roll_number"),
+                "subject": f"Seat Available: {course_name}",
+                "text": f"Seats are now available for:\n{course_name} ({unique})",
+                "title": "Seat Available! 🎉",
+                "push": f"Seats are now available for {course_name} ({unique}).",
+            })
+    return alerts
+
+
+def new_section_alerts(pending_notifs=None):
+    """Pending new-section watches with a NEW_SECTION event since they were requested → alerts."""
+    if pending_notifs is None:
+        pending_notifs = get_pending_new_section_notifications()
+        
+    if not pending_notifs: return []
 
-    new_section_changes = [c for c in changes if c.get("type") == "NEW_SECTION"]
-    if not new_section_changes: return
+    # timestamps are parsed once when the index is built, not per notification
+    index = change_log.ChangeIndex.load(
+        os.path.join(COURSE_DATA_DIR, "latestterm_changes.jsonl"),
+        os.path.join(COURSE_DATA_DIR, "latestterm_changes.json"),
+    )
+    if not index.course_codes("NEW_SECTION"): return []
 
+    alerts = []
     for notif in pending_notifs:
-        notif_id = notif.get("id")
-        roll_number = notif.get("roll_number")
         course_code = notif.get("course_code")
-        requested_at_str = notif.get("requested_at")
-
-        if not requested_at_str:
-            continue
-            
-        try:
-            req_time = parse_date(requested_at_str)
-        except Exception:
+        req_time = change_log.to_epoch(notif.get("requested_at"))
+        if req_time is None:
             continue
 
-        found_changes = []
-        for c in new_section_changes:
-            if c.get("course_code") == course_code:
-                c_time_str = c.get("timestamp")
-                if c_time_str:
-                    try:
-                        c_time = parse_date(c_time_str)
-                        # Ensure both are naive or both are timezone-aware for comparison
-                        if req_time.tzinfo is not None and c_time.tzinfo is None:
-                            c_time = c_time.replace(tzinfo=datetime.timezone.utc)
-                        elif req_time.tzinfo is None and c_time.tzinfo is not None:
-                            req_time = req_time.replace(tzinfo=datetime.timezone.utc)
-                        
-                        if c_time > req_time:
-                            found_changes.append(c)
-                    except Exception:
-                        pass
-        
+        found_changes = index.since("NEW_SECTION", course_code, req_time)
         if found_changes:
-            # Send Notification
             sections_info = "\n".join([f"- Section {c.get('section')} with {c.get('instructor', 'Unknown')}" for c in found_changes])
-            
-            # Send Email
-            email = f"{str(roll_number)}@formanite.fccollege.edu.pk"
-            subject = f"New Section Alert: {course_code}"
-            body = (
-                f"Good news!\n\n"
-                f"New sections have been added for {course_code}:\n\n"
-                f"{sections_info}\n\n"
-                f"Please log in to the portal and register ASAP.\n\n"
-                f"— FCCU Course Notifier"
-            )
-            send_email(email, subject, body)
-
-            # Send Push Notification
-            try:
-                res = supabase.table("users").select("Notification_IDs").eq("roll_number", roll_number).single().execute()
-                data = res.data
-            except Exception as e:
-                data = None
-
-            notification_ids = []
-            if data and data.get("Notification_IDs"):
-                notification_ids = data.get("Notification_IDs")
-
-            seen = set()
-            unique_subs = []
-            for sub in notification_ids:
-                if not isinstance(sub, dict): continue
-                endpoint = sub.get("endpoint")
-                if endpoint and endpoint not in seen:
-                    seen.add(endpoint)
-                    unique_subs.append(sub)
-
-            push_sent_count = 0
-            valid_subs = []
-            
-            payload = {
+            alerts.append({
+                "table": "new_section_notifications",
+                "id": notif.get("id"),
+                "roll_number": notif.get("roll_number"),
+                "subject": f"New Section Alert: {course_code}",
+                "text": f"New sections have been added for {course_code}:\n\n{sections_info}",
                 "title": "New Section Alert! 🎉",
-                "body": f"New sections for {course_code} are now available!"
+                "push": f"New sections for {course_code} are now available!",
+            })
+    return alerts
+
+
+# ---------------- NOTIFICATIONS ----------------
+def send_alerts(alerts):
+    """
+    Coalesces alerts by roll_number: each user gets one email and one push
+    per device covering all their alerts. Every alert is marked sent.
+    Returns the number of users notified.
+    """
+    if not alerts:
+        return 0
+
+    by_user = {}
+    for alert in alerts:
+        by_user.setdefault(str(alert["roll_number"]).strip(), []).append(alert)
+
+    # one batched subscription lookup for every user about to be alerted
+    subscription_cache.prefetch(by_user)
+
+    batches = []
+    pushes_uncoalesced = 0
+    emails_sent, emails_failed = mailer.stats.sent, mailer.stats.failed
+    for user_alerts in by_user.values():
+        roll_number = user_alerts[0]["roll_number"]
+        # the same section watched twice still reads once
+        parts = list({a["text"]: a for a in user_alerts}.values())
+
+        # 1. Send Email
+        email = f"{str(roll_number)}@formanite.fccollege.edu.pk"
+        if len(parts) == 1:
+            subject = parts[0]["subject"]
+        else:
+            subject = f"{len(parts)} Course Alerts: {parts[0]['subject']} and more"
+        body = (
+            f"Good news!\n\n"
+            + "\n\n".join(a["text"] for a in parts)
+            + "\n\n"
+            f"Please log in to the portal and register ASAP.\n\n"
+            f"— FCCU Course Notifier"
+        )
+        send_email(email, subject, body)
+
+        # 2. Push Notifications
+        if len(parts) == 1:
+            payload = {"title": parts[0]["title"], "body": parts[0]["push"]}
+        else:
+            more = f" (+{len(parts) - DIGEST_PUSH_ITEMS} more)" if len(parts) > DIGEST_PUSH_ITEMS else ""
+            payload = {
+                "title": f"{len(parts)} Course Alerts! 🎉",
+                "body": " ".join(a["push"] for a in parts[:DIGEST_PUSH_ITEMS]) + more,
             }
+        batch = push_batch(roll_number, payload, "Pushes sent")
+        batches.append(batch)
+        pushes_uncoalesced += len(batch["jobs"]) * len(user_alerts)
+
+    send_pushes(batches)
+    # the emails went out alongside the pushes; count what was actually delivered
+    mailer.wait()
+    emails_sent = mailer.stats.sent - emails_sent
+    emails_failed = mailer.stats.failed - emails_failed
+
+    # Mark as sent
+    for alert in alerts:
+        writes.mark(alert["table"], alert["id"])
+
+    pushes = sum(len(batch["jobs"]) for batch in batches)
+    print(
+        f"✓ Coalesced {len(alerts)} alerts into {len(by_user)} digests "
+        f"({len(alerts) / len(by_user):.1f}x) | emails {len(alerts)} → {len(by_user)} "
+        f"({emails_sent} delivered, {emails_failed} failed), pushes {pushes_uncoalesced} → {pushes}"
+    )
+    return len(by_user)
+
+
+def process_seat_notifications(courses_by_unique, notifications):
+    """Alerts every pending watch whose section now has seats. Returns alerts sent."""
+    alerts = seat_alerts(courses_by_unique, notifications)
+    send_alerts(alerts)
+    return len(alerts)
+
+
+def process_new_section_notifications(pending_notifs=None):
+    """Alerts every pending new-section watch that fired. Returns alerts sent."""
+    alerts = new_section_alerts(pending_notifs)
+    send_alerts(alerts)
+    return len(alerts)
+
+
+def flush_outbox():
+    """Waits for queued email, then writes every queued status and prune (failures → state file)."""
+    mailer.wait()
+    writes.close()
 
-            needs_cleanup = len(notification_ids) > 10
-
-            if not VAPID_PRIVATE_KEY:
-                print("⚠️ VAPID_PRIVATE_KEY not set. Skipping push notifications.")
-            else:
-                for sub in unique_subs:
-                    if not sub.get("endpoint") or not sub.get("keys"):
-                        continue
-                        
-                    success = False
-                    try:
-                        webpush(
-                            subscription_info={
-                                "endpoint": sub["endpoint"],
-                                "keys": {
-                                    "p256dh": sub["keys"].get("p256dh", ""),
-                                    "auth": sub["keys"].get("auth", "")
-                                }
-                            },
-                            data=json.dumps(payload),
-                            vapid_private_key=VAPID_PRIVATE_KEY,
-                            vapid_claims=VAPID_CLAIMS,
-                            timeout=10
-                        )
-                        push_sent_count += 1
-                        success = True
-                    except WebPushException:
-                        success = False
-                    except Exception:
-                        success = False
-
-                    if success or not needs_cleanup:
-                        valid_subs.append(sub)
-
-            print(f"✅ New Section Pushes sent: {push_sent_count} ({roll_number})")
-
-            if needs_cleanup and len(valid_subs) < len(notification_ids):
-                try:
-                    supabase.table("users").update({"Notification_IDs": valid_subs}).eq("roll_number", roll_number).execute()
-                except Exception:
-                    pass
-
-            # Mark as sent
-            supabase.table("new_section_notifications").update({"status": "sent"}).eq("id", notif_id).execute()
 
 # ---------------- MAIN LOGIC ----------------
-def main():
-    term_code = get_latest_term_code()
-    courses_by_unique = load_courses_for_term(term_code)
-    notifications = get_pending_notifications()
-    
+def get_pending_new_section_notifications():
     response = (
         supabase
         .table("new_section_notifications")
@@ -360,31 +342,45 @@ def main():
         .eq("status", "pending")
         .execute()
     )
-    new_section_notifs = response.data or []
-    
-    total_pending = len(notifications) + len(new_section_notifs)
-    print(f"✓ Term: {term_code} | Courses: {len(courses_by_unique)} | Pending Alerts: {total_pending} (Seat: {len(notifications)}, Section: {len(new_section_notifs)})")
+    return response.data or []
 
-    for notif in notifications:
-        notif_id = notif.get("id")
-        roll_number = notif.get("roll_number")
-        unique = notif.get("uniqueness")
 
-        course = courses_by_unique.get(unique)
-        if not course:
-            continue
+def open_course_lookup(term_code):
+    """mmap'd section index when the scraper wrote one for this term, else the full dict."""
+    if section_index.is_fresh(term_code, COURSE_DATA_DIR):
+        return section_index.SectionIndex.open(term_code, COURSE_DATA_DIR)
+    return load_courses_for_term(term_code)
 
-        try:
-            available = int(course.get("available", 0))
-        except ValueError:
-            available = 0
 
-        if available > 0:
-            send_course_notifications(roll_number, course, unique)
-            mark_as_sent(notif_id)
+def main():
+    # statuses a previous run could not write go first, so they are not re-sent
+    writes.replay()
 
-    # Process new section notifications
-    process_new_section_notifications(new_section_notifs)
+    term_code = get_latest_term_code()
+    courses_by_unique = open_course_lookup(term_code)
+    try:
+        notifications = get_pending_notifications()
+        new_section_notifs = get_pending_new_section_notifications()
+
+        total_pending = len(notifications) + len(new_section_notifs)
+        print(f"✓ Term: {term_code} | Courses: {len(courses_by_unique)} | Pending Alerts: {total_pending} (Seat: {len(notifications)}, Section: {len(new_section_notifs)})")
+
+        # seat and new-section alerts together, so each user gets one digest
+        alerts = seat_alerts(courses_by_unique, notifications)
+        alerts += new_section_alerts(new_section_notifs)
+        send_alerts(alerts)
+    finally:
+        # queued emails go out before the statuses are written;
+        # whatever was sent gets its status written, even if the run dies
+        flush_outbox()
+        mailer.close()
+        if pusher is not None:
+            pusher.close()
+        if isinstance(courses_by_unique, section_index.SectionIndex):
+            courses_by_unique.close()
+
+    print(f"✓ Email: {mailer.stats.summary()}")
+    print(f"✓ Supabase: {subscription_cache.summary()}, {writes.summary()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,160 @@
+"""
+synthetic_catalog.py
+--------------------
+Generates GetList-style catalog HTML offline, so parser and diff
+performance can be measured without hitting the college server.
+
+The markup mirrors what bas4.extract_courses expects:
+  - two header rows (skipped by the parser)
+  - one div.ui-grid-row per section with 8 ui-grid-col-* columns:
+        [select] [CODE NUM SEC / title] [credits] [room]
+        [days / time / Start:] [instructor] [capacity] [available]
+  - sections meeting in a second slot get an <hr> row followed by a
+    continuation row: [ ] [room] [days / time] [ ] [capacity] [available]
+
+Everything is seeded, so the same (n, seed) always produces the same HTML.
+
+    python synthetic_catalog.py 10000 > catalog_10k.html
+"""
+
+import os
+import random
+import sys
+
+DEPART_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "depart.txt")
+FALLBACK_DEPTS = ["ACCT", "BIOL", "BUSN", "CHEM", "CSCS", "ECON", "ENGL", "MATH", "PHYS", "URDU"]
+DAYS = ["M W F", "T TH", "M W", "T", "TH", "F", "S", "M T W TH F"]
+TIMES = ["8:00 - 8:50", "9:00 - 9:50", "10:00 - 10:50", "11:00 - 12:15",
+         "12:30 - 13:45", "14:00 - 15:15", "15:30 - 16:45", "17:00 - 19:30"]
+BLOCKS = ["SBLOCK", "EBLOCK", "ARMACOSH", "LIBRARY", "NEWBLOCK"]
+WORDS = ["Introduction", "Principles", "Advanced", "Topics", "Methods", "Theory",
+         "Analysis", "Design", "Systems", "Society", "Research", "Seminar", "Lab",
+         "Modern", "Applied", "History", "Culture", "Data", "Economics", "Art &"]
+SURNAMES = ["Kamran", "Ahmad", "Khan", "Siddiqui", "Malik", "Javed", "Rehman",
+            "Shafiq", "Jelani", "Butt", "Qureshi", "Hussain", "Iqbal", "Raza"]
+
+
+def load_department_codes():
+    try:
+        with open(DEPART_FILE, "r", encoding="utf-8") as f:
+            codes = [line.split(":", 1)[1].strip() for line in f if ":" in line]
+        return codes or FALLBACK_DEPTS
+    except OSError:
+        return FALLBACK_DEPTS
+
+
+def _row(cols):
+    return (
+        '<div class="ui-grid-row">'
+        + "".join(f'<div class="ui-grid-col-{w}">{c}</div>' for w, c in cols)
+        + "</div>\n"
+    )
+
+
+def _schedule(rng):
+    return f"{rng.choice(DAYS)}<br/>{rng.choice(TIMES)}<br/>Start: 08/25/2026"
+
+
+def generate_sections(n, seed=0):
+    """n section dicts with the fields the HTML is rendered from."""
+    rng = random.Random(seed)
+    depts = load_department_codes()
+    sections = []
+    used = set()
+
+    while len(sections) < n:
+        dept = rng.choice(depts)
+        num = rng.randint(100, 499)
+        sec = rng.choice("ABCDEFGHJK")
+        if (dept, num, sec) in used:
+            # dense catalogs exhaust A-K; spill into two-letter sections
+            sec = sec + rng.choice("ABCDEFGHJK")
+            if (dept, num, sec) in used:
+                continue
+        used.add((dept, num, sec))
+
+        capacity = rng.choice([25, 30, 35, 40, 45, 60])
+        sections.append({
+            "dept": dept,
+            "num": num,
+            "section": sec,
+            "title": " ".join(rng.sample(WORDS, rng.randint(2, 4))),
+            "credits": rng.choice(["3.00", "3.00", "3.00", "4.00", "1.00"]),
+            "room": f"{rng.choice(BLOCKS)}{rng.randint(1, 350):03d}",
+            "schedule": _schedule(rng),
+            "instructor": f"{rng.choice('ABCDEFGHKMNRSTZ')} {rng.choice(SURNAMES)}",
+            "capacity": capacity,
+            "available": max(0, rng.randint(-capacity // 2, capacity)),
+            # ~15% of sections meet in a second slot (lab / split room)
+            "extra": (
+                {"room": f"{rng.choice(BLOCKS)}{rng.randint(1, 350):03d}",
+                 "schedule": _schedule(rng)}
+                if rng.random() < 0.15 else None
+            ),
+        })
+    return sections
+
+
+def render_html(sections):
+    out = [
+        _row([(1, ""), (2, "Course"), (1, "Credits"), (1, "Room"), (2, "Schedule"),
+              (2, "Instructor"), (1, "Cap"), (1, "Avail")]),
+        _row([(1, ""), (2, "&nbsp;"), (1, ""), (1, ""), (2, ""), (2, ""), (1, ""), (1, "")]),
+    ]
+    for s in sections:
+        out.append(_row([
+            (1, '<input type="checkbox"/>'),
+            (2, f'<b>{s["dept"]}&nbsp;{s["num"]} {s["section"]}</b><br/><span>{s["title"].replace("&", "&amp;")}</span>'),
+            (1, s["credits"]),
+            (1, s["room"]),
+            (2, s["schedule"]),
+            (2, s["instructor"]),
+            (1, str(s["capacity"])),
+            (1, str(s["available"])),
+        ]))
+        if s["extra"]:
+            out.append('<div class="ui-grid-row"><div class="ui-grid-col-12"><hr/></div></div>\n')
+            out.append(_row([
+                (1, ""),
+                (1, s["extra"]["room"]),
+                (2, s["extra"]["schedule"]),
+                (2, ""),
+                (1, str(s["capacity"])),
+                (1, str(s["available"])),
+            ]))
+    return "".join(out)
+
+
+def generate_html(n, seed=0):
+    return render_html(generate_sections(n, seed))
+
+
+def mutate_sections(sections, seed=1, rate=0.05):
+    """
+    A "next scrape" of the same catalog: seat counts move, a few sections
+    disappear, a few appear and a few change instructor or room.
+    """
+    rng = random.Random(seed)
+    out = []
+    for s in sections:
+        r = rng.random()
+        if r < rate / 2:
+            continue  # removed
+        s = dict(s)
+        if r < rate:
+            s["instructor"] = f"{rng.choice('ABCDEFGHKMNRSTZ')} {rng.choice(SURNAMES)}"
+        elif r < rate * 1.5:
+            s["room"] = f"{rng.choice(BLOCKS)}{rng.randint(1, 350):03d}"
+        if rng.random() < rate * 4:
+            s["available"] = rng.randint(0, s["capacity"])
+        out.append(s)
+
+    for extra in generate_sections(max(1, int(len(sections) * rate / 2)), seed=seed + 1000):
+        extra["section"] = "Z" + extra["section"]  # never collides with an existing section
+        out.append(extra)
+    return out
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sys.stdout.write(generate_html(n))
@@ -0,0 +1,374 @@
+"""
+term_store.py
+-------------
+Compact columnar copy of a {term}_courses.json file, written next to it
+by the scraper as {term}_courses.bin.
+
+Every course row repeats the same ten keys and a small set of strings
+(instructors, rooms, schedules, seat counts), so the binary file stores:
+
+    b"FCTS" + version            magic
+    uint32 + JSON header         term fields, column names, row shapes,
+                                 string count, SHA-256 of the JSON it was
+                                 built from
+    uint32[strings + 1]          character offsets into the blob
+    utf-8 blob                   every distinct string once
+    uint16[rows]                 row shape ids (only if rows differ in keys)
+    uint16|uint32[rows] / key    string ids per column
+
+load() decodes the blob once and slices it, so loading skips JSON
+tokenizing entirely. to_json() reproduces the scraper's JSON byte for byte
+(json.dump, indent=2, ensure_ascii=False) for the frontend.
+
+The .bin is only used while its recorded source hash matches the JSON on
+disk (a seat count going "5" → "6" keeps the size, so size alone is not
+enough); otherwise readers fall back to json.load (see load_term). Only
+string fields are stored — anything else is refused and the term is read
+from JSON. The .bin files are build artifacts and are not committed, so
+the faster load only helps readers in the same run or checkout as the
+scraper (bas4's previous-scrape diff, instructor and history stages).
+The notifier job checks out the repo without them and reads the JSON.
+
+Run from the FCCU-Advisior root:
+    python term_store.py build            # (re)build .bin for every term
+    python term_store.py bench            # size + load time vs json.load
+    python term_store.py verify           # exporter output == JSON on disk
+"""
+
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+
+import output_writer
+
+DATA_DIR = "course_data"
+MAGIC = b"FCTS\x01"
+U32 = struct.Struct("<I")
+SWAP = sys.byteorder != "little"
+
+
+def json_path(term_code, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"{term_code}_courses.json")
+
+
+def bin_path(term_code, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"{term_code}_courses.bin")
+
+
+def to_json(data):
+    """Exactly what bas4.save_term_courses writes."""
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def content_digest(raw):
+    """SHA-256 of a term file's bytes, as recorded in the .bin / .idx header."""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def source_digest(term_code, data_dir=DATA_DIR):
+    """content_digest of the {term}_courses.json on disk, or None if it is missing."""
+    try:
+        with open(json_path(term_code, data_dir), "rb") as f:
+            return content_digest(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _le_bytes(arr):
+    if SWAP:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_le(typecode, data):
+    arr = array(typecode)
+    arr.frombytes(data)
+    if SWAP:
+        arr.byteswap()
+    return arr
+
+
+# ================= ENCODE =================
+def encode(data, source_sha256=None):
+    """Term dict (as written to {term}_courses.json) → bytes. ValueError on a non-string field."""
+    courses = data["courses"]
+
+    keys, key_index = [], {}
+    shapes, shape_index, row_shapes = [], {}, array("H")
+    strings, string_index = [], {}
+    columns = {}
+
+    for i, row in enumerate(courses):
+        shape = []
+        for key, value in row.items():
+            if not isinstance(value, str):
+                raise ValueError(
+                    f"course {row.get('unique', i)!r}: {key}={value!r} is {type(value).__name__}, "
+                    f"only string fields are stored"
+                )
+            k = key_index.get(key)
+            if k is None:
+                k = key_index[key] = len(keys)
+                keys.append(key)
+                columns[k] = []
+            shape.append(k)
+            s = string_index.get(value)
+            if s is None:
+                s = string_index[value] = len(strings)
+                strings.append(value)
+            columns[k].append((len(row_shapes), s))
+        shape = tuple(shape)
+        sid = shape_index.get(shape)
+        if sid is None:
+            sid = shape_index[shape] = len(shapes)
+            shapes.append(list(shape))
+        row_shapes.append(sid)
+
+    # string table: one blob + character offsets
+    offsets = array("I", [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    blob = "".join(strings).encode("utf-8")
+
+    id_type = "H" if len(strings) < 0xFFFF else "I"
+    missing = 0xFFFF if id_type == "H" else 0xFFFFFFFF
+    n = len(courses)
+
+    column_bytes = []
+    for k in range(len(keys)):
+        ids = array(id_type, [missing]) * n
+        for row, s in columns[k]:
+            ids[row] = s
+        column_bytes.append(_le_bytes(ids))
+
+    header = json.dumps({
+        "top_keys": list(data),
+        "meta": {k: v for k, v in data.items() if k != "courses"},
+        "keys": keys,
+        "shapes": shapes,
+        "rows": n,
+        "strings": len(strings),
+        "blob_bytes": len(blob),
+        "id_type": id_type,
+        "source_sha256": source_sha256,
+    }, ensure_ascii=False).encode("utf-8")
+
+    parts = [MAGIC, U32.pack(len(header)), header, _le_bytes(offsets), blob]
+    if len(shapes) > 1:
+        parts.append(_le_bytes(row_shapes))
+    parts.extend(column_bytes)
+    return b"".join(parts)
+
+
+def write(term_code, data, source_sha256=None, data_dir=DATA_DIR):
+    """Writes {term}_courses.bin → path, or None if the term cannot be stored (readers use the JSON)."""
+    path = bin_path(term_code, data_dir)
+    try:
+        encoded = encode(data, source_sha256)
+    except ValueError as e:
+        print(f"⚠ {term_code}: no binary copy ({e})")
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    output_writer.write_bytes(path, encoded)
+    return path
+
+
+def build_from_json(term_code, data_dir=DATA_DIR):
+    with open(json_path(term_code, data_dir), "rb") as f:
+        raw = f.read()
+    return write(term_code, json.loads(raw), content_digest(raw), data_dir)
+
+
+# ================= DECODE =================
+def read_header(buf):
+    if buf[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a term_store file")
+    pos = len(MAGIC)
+    (size,) = U32.unpack_from(buf, pos)
+    pos += U32.size
+    return json.loads(buf[pos:pos + size].decode("utf-8")), pos + size
+
+
+def decode(buf, fields=None):
+    """bytes → (header, {key: [str or None per row]}) for `fields` (default all)."""
+    header, pos = read_header(buf)
+    n = header["rows"]
+    count = header["strings"]
+
+    offsets = _from_le("I", buf[pos:pos + 4 * (count + 1)])
+    pos += 4 * (count + 1)
+    text = buf[pos:pos + header["blob_bytes"]].decode("utf-8")
+    pos += header["blob_bytes"]
+    strings = [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+    strings.append(None)  # missing-key sentinel maps past the end
+
+    uniform = len(header["shapes"]) <= 1
+    if not uniform:
+        header["row_shapes"] = _from_le("H", buf[pos:pos + 2 * n])
+        pos += 2 * n
+
+    id_type = header["id_type"]
+    width = array(id_type).itemsize
+    missing = 0xFFFF if id_type == "H" else 0xFFFFFFFF
+    wanted = set(fields) if fields is not None else None
+
+    columns = {}
+    for key in header["keys"]:
+        if wanted is None or key in wanted:
+            ids = _from_le(id_type, buf[pos:pos + width * n])
+            if uniform:  # every row has every key → no sentinels to map
+                columns[key] = list(map(strings.__getitem__, ids))
+            else:
+                columns[key] = [strings[i if i != missing else count] for i in ids]
+        pos += width * n
+    return header, columns
+
+
+def _read(term_code, data_dir):
+    with open(bin_path(term_code, data_dir), "rb") as f:
+        return f.read()
+
+
+def load(term_code, data_dir=DATA_DIR):
+    """The same dict json.load would return for {term}_courses.json."""
+    header, columns = decode(_read(term_code, data_dir))
+    keys = header["keys"]
+    shapes = [[keys[k] for k in shape] for shape in header["shapes"]]
+
+    if len(shapes) <= 1:
+        order = shapes[0] if shapes else []
+        rows = zip(*(columns[k] for k in order))
+        courses = list(map(dict, map(zip, itertools.repeat(order), rows)))
+    else:
+        courses = [
+            {k: columns[k][row] for k in shapes[sid]}
+            for row, sid in enumerate(header["row_shapes"])
+        ]
+
+    meta = header["meta"]
+    return {k: courses if k == "courses" else meta[k] for k in header["top_keys"]}
+
+
+def load_columns(term_code, fields, data_dir=DATA_DIR):
+    """
+    Only the requested fields, as parallel lists — cheapest way to scan a term.
+    → (term fields such as term_code / term_name, {field: [value per row]})
+    """
+    header, columns = decode(_read(term_code, data_dir), fields)
+    return header["meta"], columns
+
+
+def load_columns_if_built_from(term_code, fields, source_sha256, data_dir=DATA_DIR):
+    """
+    load_columns, but only from a .bin built from the JSON bytes hashing to
+    `source_sha256` → (meta, columns), or None (missing, stale or unreadable).
+    Lets a caller that already read the JSON pin the columns to those exact bytes.
+    """
+    try:
+        buf = _read(term_code, data_dir)
+        header, _ = read_header(buf)
+        if header.get("source_sha256") != source_sha256:
+            return None
+        header, columns = decode(buf, fields)
+    except (OSError, ValueError, struct.error):
+        return None
+    return header["meta"], columns
+
+
+def is_fresh(term_code, data_dir=DATA_DIR):
+    """True when the .bin was built from the JSON currently on disk (same SHA-256)."""
+    bpath = bin_path(term_code, data_dir)
+    if not os.path.exists(bpath):
+        return False
+    try:
+        with open(bpath, "rb") as f:
+            head = f.read(64 * 1024)
+        header, _ = read_header(head)
+    except (ValueError, struct.error, UnicodeDecodeError, json.JSONDecodeError):
+        return False
+    recorded = header.get("source_sha256")
+    return recorded is not None and recorded == source_digest(term_code, data_dir)
+
+
+def load_term(term_code, data_dir=DATA_DIR):
+    """Term dict from the .bin when it is current, else from the JSON."""
+    if is_fresh(term_code, data_dir):
+        return load(term_code, data_dir)
+    with open(json_path(term_code, data_dir), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def export(term_code, out_path=None, data_dir=DATA_DIR):
+    """.bin → {term}_courses.json (or out_path), byte-identical to the scraper's output."""
+    out_path = out_path or json_path(term_code, data_dir)
+    output_writer.write_text(out_path, to_json(load(term_code, data_dir)))
+    return out_path
+
+
+# ================= CLI =================
+def _terms(data_dir=DATA_DIR):
+    return sorted(
+        os.path.basename(p)[:-len("_courses.json")]
+        for p in glob.glob(os.path.join(data_dir, "*_courses.json"))
+    )
+
+
+def _best(fn, repeat=20):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        secs = time.perf_counter() - t0
+        best = secs if best is None else min(best, secs)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build, benchmark or verify the binary term files")
+    parser.add_argument("cmd", choices=["build", "bench", "verify"])
+    parser.add_argument("--terms", help="comma-separated term codes (default: every *_courses.json)")
+    args = parser.parse_args()
+    terms = args.terms.split(",") if args.terms else _terms()
+
+    for term in terms:
+        if not is_fresh(term) or args.cmd == "build":
+            path = build_from_json(term)
+            if path is None:
+                continue
+            if args.cmd == "build":
+                print(f"✓ {term}: {os.path.getsize(path):,} bytes → {path}")
+                continue
+
+        if args.cmd == "bench":
+            jpath, bpath = json_path(term), bin_path(term)
+
+            def load_json():
+                with open(jpath, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            t_json = _best(load_json)
+            t_bin = _best(lambda: load_term(term))  # includes the freshness hash
+            t_cols = _best(lambda: load_columns(term, ["course_code", "course_name", "credits"]))
+            j_size, b_size = os.path.getsize(jpath), os.path.getsize(bpath)
+            print(f"→ {term}: {j_size:,} B json / {b_size:,} B bin ({b_size / j_size:.0%})")
+            print(f"   json.load {t_json * 1000:7.2f} ms | load_term {t_bin * 1000:7.2f} ms "
+                  f"({t_json / t_bin:.1f}x) | 3 columns {t_cols * 1000:7.2f} ms ({t_json / t_cols:.1f}x)")
+
+        else:
+            with open(json_path(term), "r", encoding="utf-8", newline="") as f:
+                on_disk = f.read()
+            exported = to_json(load(term))
+            same = exported == on_disk
+            # files that went through a CRLF checkout differ only in line endings
+            same_lines = exported == on_disk.replace("\r\n", "\n")
+            status = "identical" if same else ("identical (modulo CRLF)" if same_lines else "DIFFERENT")
+            print(f"{'✓' if same_lines else '❌'} {term}: {status}")
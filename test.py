@@ -119,93 +119,3 @@ def main():
 # ---------- RUN SCRIPT ----------
 if __name__ == "__main__":
     main()
-
-# def enrich_latest_instructors_with_previous_term():
-
-#     import os, json
-
-#     DATA_DIR = "course_data"
-
-#     # ===== LOAD LATEST TERM =====
-#     with open(os.path.join(DATA_DIR, "latest_term.json"), "r", encoding="utf-8") as f:
-#         latest = json.load(f)
-
-#     term_code = latest["term_code"]
-
-#     latest_file = os.path.join(DATA_DIR, f"{term_code}_instructors.json")
-#     prev_file = os.path.join(DATA_DIR, "2026SP_courses.json")
-
-#     print(f"→ Updating: {latest_file}")
-#     print(f"→ Using: {prev_file}")
-
-#     # ===== LOAD DATA =====
-#     with open(latest_file, "r", encoding="utf-8") as f:
-#         instructor_list = json.load(f)
-
-#     with open(prev_file, "r", encoding="utf-8") as f:
-#         prev_courses = json.load(f)["courses"]
-
-#     # ================= BUILD MAP =================
-#     # KEY = name|dept BUT object stays unified per instructor+dept group
-#     instructors = {}
-
-#     for inst in instructor_list:
-#         name = inst["name"].strip()
-
-#         for dept in inst["departments"]:
-#             dept_clean = dept.strip().upper()
-#             key = f"{name}|{dept_clean}"
-
-#             instructors[key] = {
-#                 "name": name,
-#                 "departments": set(inst["departments"]),
-#                 "current_courses": inst.get("current_courses", [])[:],
-#                 "all_courses": set(inst.get("all_courses", []))
-#             }
-
-#     # ================= PROCESS PREVIOUS TERM =================
-#     for course in prev_courses:
-
-#         instructor = (course.get("instructor") or "").strip()
-#         if not instructor:
-#             continue
-
-#         course_code = course["course_code"].strip()
-#         dept = course_code.split()[0].strip().upper()
-
-#         key = f"{instructor}|{dept}"
-
-#         # CREATE IF NOT EXISTS
-#         if key not in instructors:
-#             instructors[key] = {
-#                 "name": instructor,
-#                 "departments": {dept},
-#                 "current_courses": [],
-#                 "all_courses": set()
-#             }
-
-#         inst = instructors[key]
-
-#         # ADD COURSE TO HISTORY ONLY (previous term)
-#         inst["all_courses"].add(course_code)
-
-#     # ================= CONVERT BACK =================
-#     final = []
-
-#     for inst in instructors.values():
-
-#         final.append({
-#             "name": inst["name"],
-#             "departments": sorted(list(inst["departments"])),
-#             "current_courses": inst["current_courses"],  # untouched (latest term)
-#             "all_courses": sorted(list(inst["all_courses"]))
-#         })
-
-#     # ================= SAVE =================
-#     with open(latest_file, "w", encoding="utf-8") as f:
-#         json.dump(final, f, indent=2, ensure_ascii=False)
-
-#     print("✓ Done — properly merged previous term into all_courses")
-
-
-# enrich_latest_instructors_with_previous_term()
\ No newline at end of file
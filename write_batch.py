@@ -0,0 +1,190 @@
+"""
+write_batch.py
+--------------
+Write-behind batching for the notifier's Supabase writes.
+
+The notifier used to send one update().eq("id", ...) per notification
+it marked as sent, and one users update per subscription cleanup.
+WriteBatcher queues both kinds of write and flushes them together:
+
+    status changes       update({"status": s}).in_("id", [...])   per table/status
+    subscription prunes  update({"Notification_IDs": ...}).eq("roll_number", r)
+                         per user — each user gets a different value, and an
+                         upsert would INSERT a partial users row for a roll
+                         number that was deleted meanwhile
+
+A flush happens when max_items writes are queued, when the oldest queued
+write is max_age seconds old, and on close(). The age limit is a
+threading.Timer armed by the first write of each batch, so a queue that
+goes quiet is still flushed without waiting for another mark()/prune();
+flushes are serialized, the timer's and the caller's alike. Writes that still fail are
+saved to STATE_FILE (repo root, not committed); the next run's replay()
+applies them before fetching pending notifications, so a notification
+that was delivered is not alerted again.
+
+    writes = WriteBatcher(supabase)
+    writes.replay()
+    writes.mark("seed_availability_notifications", notif_id)
+    writes.prune(roll_number, valid_subs)
+    writes.close()        # final flush, persists anything that failed
+"""
+
+import json
+import os
+import threading
+import time
+
+STATE_FILE = ".notifier_pending_writes.json"
+USERS_TABLE = "users"
+MAX_ITEMS = 100
+MAX_AGE_SECS = 5.0
+CHUNK = 200  # ids per in_()
+
+
+class WriteBatcher:
+    def __init__(self, client, max_items=MAX_ITEMS, max_age=MAX_AGE_SECS, state_file=STATE_FILE):
+        self.client = client
+        self.max_items = max_items
+        self.max_age = max_age
+        self.state_file = state_file
+        self.round_trips = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one flush at a time (timer thread vs caller)
+        self._timer = None
+        self._statuses = {}   # (table, status) → [ids]
+        self._prunes = {}     # roll_number → subscriptions (latest wins)
+        self._failed = {"statuses": {}, "prunes": {}}
+        self._oldest = None
+
+    # ================= QUEUE =================
+    def mark(self, table, row_id, status="sent"):
+        with self._lock:
+            self._statuses.setdefault((table, status), []).append(row_id)
+            self._queued()
+        self._maybe_flush()
+
+    def prune(self, roll_number, subscriptions):
+        with self._lock:
+            self._prunes[roll_number] = subscriptions
+            self._queued()
+        self._maybe_flush()
+
+    def _queued(self):
+        """Called with _lock held after queueing; the first write of a batch arms the age timer."""
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+            self._timer = threading.Timer(self.max_age, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"⚠ Timed flush failed: {e}")
+
+    def pending(self):
+        return sum(len(ids) for ids in self._statuses.values()) + len(self._prunes)
+
+    def _maybe_flush(self):
+        if self._oldest is None:
+            return
+        if self.pending() >= self.max_items or time.monotonic() - self._oldest >= self.max_age:
+            self.flush()
+
+    # ================= FLUSH =================
+    def flush(self):
+        """Writes everything queued → number of writes that failed (kept for close())."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            statuses, self._statuses = self._statuses, {}
+            prunes, self._prunes = self._prunes, {}
+            self._oldest = None
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()  # no-op when this flush is the timer's own
+
+        failed = 0
+        for (table, status), ids in statuses.items():
+            ids = list(dict.fromkeys(ids))
+            for i in range(0, len(ids), CHUNK):
+                chunk = ids[i:i + CHUNK]
+                try:
+                    self._execute(self.client.table(table).update({"status": status}).in_("id", chunk))
+                    self.written += len(chunk)
+                except Exception as e:
+                    print(f"⚠ Status batch failed ({table}, {len(chunk)} rows): {e}")
+                    self._fail_statuses(table, status, chunk)
+                    failed += len(chunk)
+
+        # update, never upsert: a prune must not create a users row
+        for roll, subs in prunes.items():
+            try:
+                self._execute(
+                    self.client.table(USERS_TABLE)
+                    .update({"Notification_IDs": subs})
+                    .eq("roll_number", roll)
+                )
+                self.written += 1
+            except Exception as e:
+                print(f"⚠ Subscription cleanup failed ({roll}): {e}")
+                with self._lock:
+                    self._failed["prunes"][str(roll)] = subs
+                failed += 1
+        return failed
+
+    def _execute(self, query):
+        self.round_trips += 1
+        return query.execute()
+
+    def _fail_statuses(self, table, status, ids):
+        with self._lock:
+            self._failed["statuses"].setdefault(f"{table}|{status}", []).extend(ids)
+
+    # ================= PERSIST =================
+    def close(self):
+        """Final flush; failed writes → STATE_FILE (removed once everything is through)."""
+        self.flush()
+        with self._lock:
+            failed = self._failed
+            self._failed = {"statuses": {}, "prunes": {}}
+        count = sum(len(ids) for ids in failed["statuses"].values()) + len(failed["prunes"])
+        if count:
+            tmp = self.state_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(failed, f)
+            os.replace(tmp, self.state_file)
+            print(f"⚠ {count} writes failed → saved to {self.state_file}, retried next run")
+        elif os.path.exists(self.state_file):
+            os.remove(self.state_file)
+        return count
+
+    def replay(self):
+        """Re-queues and flushes the writes a previous run could not apply → writes replayed."""
+        if not os.path.exists(self.state_file):
+            return 0
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Unreadable {self.state_file} ({e}) → ignored")
+            return 0
+
+        with self._lock:
+            for key, ids in state.get("statuses", {}).items():
+                table, status = key.rsplit("|", 1)
+                self._statuses.setdefault((table, status), []).extend(ids)
+            for roll, subs in state.get("prunes", {}).items():
+                self._prunes.setdefault(roll, subs)
+            self._queued()
+            count = self.pending()
+        print(f"→ Replaying {count} writes from the previous run")
+        self.flush()
+        return count
+
+    def summary(self):
+        return f"{self.written} writes in {self.round_trips} requests"